@@ -0,0 +1,59 @@
+import argparse
+
+from homework01 import parallel, rsa
+from homework01.ciphers import CHUNK_SIZE, CIPHERS, MODES, check_paths, parse_key, transform_file
+
+
+def run_benchmark(target):
+    if target == 'rsa':
+        print(f"{'bits':>6} {'us/block':>10} {'crt':>10}")
+        for bits, latency, crt_latency in rsa.benchmark():
+            print(f'{bits:>6} {latency:>10.1f} {crt_latency:>10.1f}')
+    elif target == 'batch':
+        print(f"{'workers':>8} {'enc msg/s':>10} {'dec msg/s':>10}")
+        for workers, encrypted, decrypted in rsa.benchmark_many():
+            print(f'{workers:>8} {encrypted:>10.0f} {decrypted:>10.0f}')
+    elif target == 'parallel':
+        print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+        for workers, elapsed, speedup in parallel.benchmark():
+            print(f'{workers:>8} {elapsed:>10.3f} {speedup:>8.2f}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m homework01', description='Classical ciphers for files.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for mode in MODES:
+        command = commands.add_parser(mode, help=f'{mode} a file')
+        command.add_argument('--cipher', choices=CIPHERS, required=True)
+        command.add_argument('--key', required=True, help='shift for caesar, keyword for vigenere')
+        command.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        command.add_argument('--workers', type=int, default=1, help='number of worker processes')
+        command.add_argument('src')
+        command.add_argument('dst')
+
+    command = commands.add_parser('benchmark', help='run a benchmark')
+    command.add_argument('target', choices=('batch', 'parallel', 'rsa'))
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'benchmark':
+        run_benchmark(args.target)
+        return
+
+    try:
+        key = parse_key(args.cipher, args.key)
+        check_paths(args.src, args.dst)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.workers > 1:
+        parallel.transform_file_parallel(
+            args.src, args.dst, args.cipher, args.command, key, args.workers, args.chunk_size
+        )
+    else:
+        transform_file(args.src, args.dst, args.cipher, args.command, key, args.chunk_size)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,8 @@
+import functools
+
+CHUNK_SIZE = 1 << 20
+
+
 def encrypt_caesar(plaintext, shift):
     """
     Encrypts plaintext using a Caesar cipher.
@@ -56,3 +61,74 @@ def decrypt_caesar(ciphertext, shift):
         plaintext += char
 
     return plaintext
+
+
+@functools.lru_cache(maxsize=None)
+def _caesar_tables(shift, decrypt=False):
+    """
+    Builds str and bytes translation tables for a shift.
+
+    The tables are derived from the per-character functions above, so the
+    bulk functions produce exactly the same output.
+    """
+    convert = decrypt_caesar if decrypt else encrypt_caesar
+    source = bytes(range(ord("A"), ord("z") + 1))
+    target = convert(source.decode("ascii"), shift).encode("ascii")
+    return str.maketrans(source.decode("ascii"), target.decode("ascii")), bytes.maketrans(source, target)
+
+
+def _translate(data, shift, decrypt):
+    str_table, bytes_table = _caesar_tables(shift % 26, decrypt)
+    if isinstance(data, str):
+        return data.translate(str_table)
+    return bytes(data).translate(bytes_table)
+
+
+def encrypt_caesar_bulk(data, shift):
+    """
+    Encrypts str or bytes using a precomputed translation table.
+
+    >>> encrypt_caesar_bulk("Python3.6", 3)
+    'Sbwkrq3.6'
+    >>> encrypt_caesar_bulk(b"Python3.6", 3)
+    b'Sbwkrq3.6'
+    >>> encrypt_caesar_bulk("PYTHON", 29) == encrypt_caesar("PYTHON", 29)
+    True
+    """
+    return _translate(data, shift, decrypt=False)
+
+
+def decrypt_caesar_bulk(data, shift):
+    """
+    Decrypts str or bytes using a precomputed translation table.
+
+    >>> decrypt_caesar_bulk("Sbwkrq3.6", 3)
+    'Python3.6'
+    >>> decrypt_caesar_bulk(b"Sbwkrq3.6", 3)
+    b'Python3.6'
+    """
+    return _translate(data, shift, decrypt=True)
+
+
+def _translate_file(src, dst, shift, decrypt, chunk_size):
+    _, table = _caesar_tables(shift % 26, decrypt)
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        for chunk in iter(functools.partial(fin.read, chunk_size), b""):
+            fout.write(chunk.translate(table))
+
+
+def encrypt_caesar_file(src, dst, shift, chunk_size=CHUNK_SIZE):
+    """
+    Encrypts the file src into dst reading at most chunk_size bytes at a time.
+
+    Only ASCII letters are changed, so any ASCII-compatible encoding
+    (UTF-8 included) passes through untouched.
+    """
+    _translate_file(src, dst, shift, False, chunk_size)
+
+
+def decrypt_caesar_file(src, dst, shift, chunk_size=CHUNK_SIZE):
+    """
+    Decrypts the file src into dst reading at most chunk_size bytes at a time.
+    """
+    _translate_file(src, dst, shift, True, chunk_size)
@@ -0,0 +1,126 @@
+import mmap
+import os
+import re
+
+from homework01.caesar import decrypt_caesar_bulk, encrypt_caesar_bulk
+from homework01.vigenere import decrypt_vigenere_bulk, encrypt_vigenere_bulk
+
+CHUNK_SIZE = 1 << 20
+
+CIPHERS = ('caesar', 'vigenere')
+MODES = ('encrypt', 'decrypt')
+
+# UTF-8 continuation bytes (0b10xxxxxx) do not start a new character
+CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+_RUNS = re.compile(rb'[\x00-\x7f]+|[\x80-\xff]+')
+
+
+def parse_key(cipher, key):
+    """
+    Converts a command line key into the form the cipher expects.
+
+    >>> parse_key('caesar', '3')
+    3
+    >>> parse_key('vigenere', 'LEMON')
+    'LEMON'
+    """
+    if cipher == 'caesar':
+        return int(key)
+    if not key:
+        raise ValueError('Keyword must not be empty.')
+    return key
+
+
+def apply_cipher(cipher, mode, key, data, offset=0):
+    """
+    Applies a classical cipher to str or bytes.
+
+    The offset is the position of data in the whole text; it keeps the
+    Vigenere keyword aligned when a text is processed piece by piece.
+
+    >>> apply_cipher('caesar', 'encrypt', 3, b'PYTHON')
+    b'SBWKRQ'
+    >>> apply_cipher('vigenere', 'encrypt', 'LEMON', 'ATTACK') + apply_cipher('vigenere', 'encrypt', 'LEMON', 'ATDAWN', 6)
+    'LXFOPVEFRNHR'
+    >>> apply_cipher('vigenere', 'decrypt', 'LEMON', 'EFRNHR', offset=6)
+    'ATDAWN'
+    """
+    if cipher == 'caesar':
+        convert = encrypt_caesar_bulk if mode == 'encrypt' else decrypt_caesar_bulk
+        return convert(data, key)
+    if cipher == 'vigenere':
+        convert = encrypt_vigenere_bulk if mode == 'encrypt' else decrypt_vigenere_bulk
+        return convert(data, key, offset)
+    raise ValueError(f'Unknown cipher: {cipher}')
+
+
+def count_chars(data):
+    """
+    Counts the UTF-8 characters in bytes: every byte but continuation bytes.
+
+    >>> count_chars('héllo'.encode('utf-8'))
+    5
+    """
+    return len(data.translate(None, CONTINUATION_BYTES))
+
+
+def apply_cipher_utf8(cipher, mode, key, data, offset=0):
+    """
+    Applies a cipher to UTF-8 encoded bytes, advancing the Vigenere keyword
+    per character like the str functions do; the offset counts characters.
+
+    Only ASCII letters are changed, so non-ASCII runs are copied as they are
+    and ASCII runs go through the bulk functions.
+
+    >>> from homework01.vigenere import encrypt_vigenere
+    >>> text = 'héllo WORLD ñ attack at dawn'
+    >>> data = apply_cipher_utf8('vigenere', 'encrypt', 'LEMON', text.encode('utf-8'))
+    >>> data.decode('utf-8') == encrypt_vigenere(text, 'LEMON')
+    True
+    """
+    if cipher != 'vigenere' or data.isascii():
+        return apply_cipher(cipher, mode, key, data, offset)
+
+    pieces = []
+    for run in _RUNS.finditer(data):
+        piece = run.group()
+        pieces.append(apply_cipher(cipher, mode, key, piece, offset) if piece.isascii() else piece)
+        offset += count_chars(piece)
+    return b''.join(pieces)
+
+
+def check_paths(src, dst):
+    """
+    Raises ValueError if src and dst are the same file: the output is
+    preallocated before the input is read, so it would wipe the input.
+    """
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise ValueError(f'Source and destination are the same file: {dst}')
+
+
+def transform_file(src, dst, cipher, mode, key, chunk_size=CHUNK_SIZE):
+    """
+    Applies a cipher to the file src and writes the result into dst.
+
+    The input is memory-mapped and the output is written through a
+    preallocated map of the same size, so only one chunk of the text
+    is held in memory at a time. The text is read as UTF-8: the Vigenere
+    keyword advances per character, as in encrypt_vigenere on the decoded
+    text.
+    """
+    check_paths(src, dst)
+    size = os.path.getsize(src)
+
+    with open(src, 'rb') as fin, open(dst, 'w+b') as fout:
+        fout.truncate(size)
+        if not size:
+            return
+
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as source, \
+                mmap.mmap(fout.fileno(), size) as target:
+            offset = 0
+            for start in range(0, size, chunk_size):
+                chunk = source[start:min(start + chunk_size, size)]
+                target[start:start + len(chunk)] = apply_cipher_utf8(cipher, mode, key, chunk, offset)
+                offset += count_chars(chunk)
+            target.flush()
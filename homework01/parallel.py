@@ -0,0 +1,110 @@
+import functools
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from homework01.ciphers import apply_cipher, apply_cipher_utf8, check_paths, count_chars, transform_file
+
+CHUNK_SIZE = 1 << 22
+
+
+def _split(length, chunk_size):
+    return [(start, min(start + chunk_size, length)) for start in range(0, length, chunk_size)]
+
+
+def process_parallel(cipher, mode, key, data, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Applies a cipher to str or bytes on a pool of worker processes.
+
+    The data is split into chunks of chunk_size characters; each chunk is
+    processed with the keyword phase of its start and the results are
+    joined back in order.
+
+    >>> process_parallel('vigenere', 'encrypt', 'LEMON', 'ATTACKATDAWN', workers=2, chunk_size=5)
+    'LXFOPVEFRNHR'
+    >>> process_parallel('caesar', 'decrypt', 3, b'Sbwkrq3.6', workers=2, chunk_size=4)
+    b'Python3.6'
+    """
+    if chunk_size <= 0:
+        raise ValueError('chunk_size must be positive')
+
+    bounds = _split(len(data), chunk_size)
+    if len(bounds) <= 1 or workers == 1:
+        return apply_cipher(cipher, mode, key, data)
+
+    convert = functools.partial(apply_cipher, cipher, mode, key)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(convert, [data[start:end] for start, end in bounds], [start for start, _ in bounds])
+        return data[:0].join(parts)
+
+
+def encrypt_parallel(cipher, key, data, workers=None, chunk_size=CHUNK_SIZE):
+    return process_parallel(cipher, 'encrypt', key, data, workers, chunk_size)
+
+
+def decrypt_parallel(cipher, key, data, workers=None, chunk_size=CHUNK_SIZE):
+    return process_parallel(cipher, 'decrypt', key, data, workers, chunk_size)
+
+
+def _transform_range(src, dst, cipher, mode, key, start, end, offset):
+    with open(src, 'rb') as fin, open(dst, 'r+b') as fout, \
+            mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as source, \
+            mmap.mmap(fout.fileno(), 0) as target:
+        target[start:end] = apply_cipher_utf8(cipher, mode, key, source[start:end], offset)
+        target.flush()
+
+
+def transform_file_parallel(src, dst, cipher, mode, key, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Applies a cipher to the file src on a pool of worker processes.
+
+    Every worker maps both files itself and writes its own range of the
+    preallocated output, so no text travels between processes. For the
+    Vigenere cipher the parent first counts the UTF-8 characters before
+    every range, since the keyword advances per character.
+    """
+    check_paths(src, dst)
+    size = os.path.getsize(src)
+    bounds = _split(size, chunk_size)
+    if len(bounds) <= 1 or workers == 1:
+        transform_file(src, dst, cipher, mode, key, chunk_size)
+        return
+
+    offsets = [0] * len(bounds)
+    if cipher == 'vigenere':
+        with open(src, 'rb') as fin, mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            for index, (start, end) in enumerate(bounds[:-1]):
+                offsets[index + 1] = offsets[index] + count_chars(source[start:end])
+
+    with open(dst, 'wb') as fout:
+        fout.truncate(size)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_transform_range, src, dst, cipher, mode, key, start, end, offset)
+            for (start, end), offset in zip(bounds, offsets)
+        ]
+        for future in futures:
+            future.result()
+
+
+def benchmark(size=1 << 26, max_workers=None, chunk_size=CHUNK_SIZE, cipher='vigenere', key='LEMON'):
+    """
+    Measures encryption time of size bytes for 1..max_workers processes.
+
+    Returns a list of (workers, seconds, speedup) tuples.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    data = os.urandom(size)
+    results = []
+
+    for workers in range(1, max_workers + 1):
+        started = time.perf_counter()
+        process_parallel(cipher, 'encrypt', key, data, workers, chunk_size)
+        elapsed = time.perf_counter() - started
+        speedup = results[0][1] / elapsed if results else 1.0
+        results.append((workers, elapsed, speedup))
+
+    return results
+
@@ -1,3 +1,6 @@
+import functools
+
+
 def encrypt_vigenere(plaintext, keyword):
     """
     Encrypts plaintext using a Vigenere cipher.
@@ -62,3 +65,67 @@ def decrypt_vigenere(ciphertext, keyword):
         plaintext += sub
 
     return plaintext
+
+
+@functools.lru_cache(maxsize=None)
+def _vigenere_tables(key_char, decrypt=False):
+    """
+    Builds str and bytes translation tables for a single keyword letter.
+
+    The tables are derived from the per-character functions above, so the
+    bulk functions keep their semantics, non-letters included.
+    """
+    convert = decrypt_vigenere if decrypt else encrypt_vigenere
+    source = ''.join(chr(code) for code in range(ord('A'), ord('z') + 1))
+    target = convert(source, key_char)
+    return str.maketrans(source, target), bytes.maketrans(source.encode('ascii'), target.encode('latin-1'))
+
+
+def _translate(data, keyword, offset, decrypt):
+    period = len(keyword)
+    tables = [_vigenere_tables(keyword[(offset + index) % period], decrypt) for index in range(period)]
+
+    if isinstance(data, str):
+        if data.isascii():
+            return _translate(data.encode('ascii'), keyword, offset, decrypt).decode('latin-1')
+
+        result = list(data)
+        for index, (str_table, _) in enumerate(tables):
+            result[index::period] = data[index::period].translate(str_table)
+        return ''.join(result)
+
+    # Every keyword position is handled by a single strided slice, so the
+    # per-character work happens inside bytes.translate.
+    result = bytearray(data)
+    for index, (_, bytes_table) in enumerate(tables):
+        result[index::period] = result[index::period].translate(bytes_table)
+    return bytes(result)
+
+
+def encrypt_vigenere_bulk(data, keyword, offset=0):
+    """
+    Encrypts str or bytes with a Vigenere cipher, one strided slice per keyword letter.
+
+    The offset is the keyword position of the first character, so the
+    data may be a piece taken from the middle of a longer text.
+
+    >>> encrypt_vigenere_bulk("ATTACKATDAWN", "LEMON")
+    'LXFOPVEFRNHR'
+    >>> encrypt_vigenere_bulk(b"ATTACK AT DAWN", "LEMON")
+    b'LXFOPV MH OEIB'
+    >>> encrypt_vigenere_bulk("DAWN", "LEMON", offset=8)
+    'RNHR'
+    """
+    return _translate(data, keyword, offset, decrypt=False)
+
+
+def decrypt_vigenere_bulk(data, keyword, offset=0):
+    """
+    Decrypts str or bytes with a Vigenere cipher, one strided slice per keyword letter.
+
+    >>> decrypt_vigenere_bulk("LXFOPVEFRNHR", "LEMON")
+    'ATTACKATDAWN'
+    >>> decrypt_vigenere_bulk(b"LXFOPV MH OEIB", "LEMON")
+    b'ATTACK AT DAWN'
+    """
+    return _translate(data, keyword, offset, decrypt=True)
@@ -0,0 +1,159 @@
+import argparse
+import json
+import multiprocessing
+import pathlib
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore
+
+from sudoku import BACKENDS, SolveStats, solve
+from sudoku_batch import read_puzzles
+
+CORPORA_DIR = pathlib.Path(__file__).parent / 'corpora'
+CORPORA = ('easy', 'hard', 'pathological')
+# Перебор по порядку решает пазлы из pathological больше минуты,
+# поэтому по умолчанию он не запускается.
+DEFAULT_BACKENDS = ('propagation', 'dlx')
+
+
+def percentile(values: List[float], q: float) -> float:
+    """ Перцентиль q (0..100) по ближайшему рангу
+
+    >>> percentile([1, 2, 3, 4], 50)
+    2
+    >>> percentile([5, 1, 3], 99)
+    5
+    """
+    ordered = sorted(values)
+    rank = max(0, -(-len(ordered) * q // 100) - 1)
+    return ordered[int(rank)]
+
+
+def run_corpus(backend: str, corpus: str) -> Dict[str, object]:
+    """ Решить все пазлы корпуса и собрать статистику по времени и узлам """
+    puzzles = list(read_puzzles(str(CORPORA_DIR / f'{corpus}.txt')))
+    times = []
+    nodes = []
+    solved = 0
+
+    for puzzle in puzzles:
+        stats = SolveStats()
+        started = time.perf_counter()
+        solution = solve(puzzle, backend, stats)
+        times.append(time.perf_counter() - started)
+        nodes.append(stats.nodes)
+        solved += solution is not None
+
+    # Пиковый RSS процесса в байтах: ru_maxrss в macOS - в байтах,
+    # в Linux и других системах - в КиБ
+    peak_memory = None
+    if resource is not None:
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != 'darwin':
+            peak_memory *= 1024
+
+    return {
+        'backend': backend,
+        'corpus': corpus,
+        'puzzles': len(puzzles),
+        'solved': solved,
+        'mean': statistics.mean(times),
+        'p50': percentile(times, 50),
+        'p99': percentile(times, 99),
+        'max': max(times),
+        'nodes_mean': statistics.mean(nodes),
+        'nodes_max': max(nodes),
+        'peak_memory': peak_memory,
+    }
+
+
+def run(backends=DEFAULT_BACKENDS, corpora=CORPORA, label: Optional[str] = None) -> Dict[str, object]:
+    """ Запустить все решатели на всех корпусах
+
+    Каждая пара решатель/корпус выполняется в новом процессе, чтобы
+    пиковая память и состояние сборщика мусора не зависели от соседей.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for backend in backends:
+        for corpus in corpora:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results.append(pool.submit(run_corpus, backend, corpus).result())
+
+    return {
+        'label': label,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+def compare(baseline: Dict[str, object], current: Dict[str, object], threshold: float = 1.25) -> List[str]:
+    """ Найти регрессии: среднее время или число узлов выросло больше чем в threshold раз
+
+    >>> old = {'results': [{'backend': 'dlx', 'corpus': 'easy', 'mean': 1.0, 'nodes_mean': 10}]}
+    >>> new = {'results': [{'backend': 'dlx', 'corpus': 'easy', 'mean': 2.0, 'nodes_mean': 10}]}
+    >>> compare(old, new)
+    ['dlx/easy: mean 1.000000 -> 2.000000 (x2.00)']
+    >>> compare(old, old)
+    []
+    """
+    previous = {(r['backend'], r['corpus']): r for r in baseline['results']}  # type: ignore
+    regressions = []
+
+    for result in current['results']:  # type: ignore
+        old: Optional[dict] = previous.get((result['backend'], result['corpus']))
+        if old is None:
+            continue
+        for key in ('mean', 'nodes_mean'):
+            if old[key] and result[key] / old[key] > threshold:
+                regressions.append(
+                    f"{result['backend']}/{result['corpus']}: {key} "
+                    f"{old[key]:.6f} -> {result[key]:.6f} (x{result[key] / old[key]:.2f})"
+                )
+
+    return regressions
+
+
+def print_table(report: Dict[str, object]) -> None:
+    print(f"{'backend':<13}{'corpus':<14}{'mean ms':>9}{'p50 ms':>9}{'p99 ms':>10}{'nodes':>10}{'peak MiB':>10}")
+    for r in report['results']:  # type: ignore
+        memory = '-' if r['peak_memory'] is None else f"{r['peak_memory'] / 2 ** 20:.1f}"
+        print(
+            f"{r['backend']:<13}{r['corpus']:<14}{r['mean'] * 1e3:>9.2f}{r['p50'] * 1e3:>9.2f}"
+            f"{r['p99'] * 1e3:>10.2f}{r['nodes_mean']:>10.1f}{memory:>10}"
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Замер скорости решателей Судоку.')
+    parser.add_argument('--backends', nargs='+', choices=sorted(BACKENDS), default=DEFAULT_BACKENDS)
+    parser.add_argument('--corpora', nargs='+', choices=CORPORA, default=CORPORA)
+    parser.add_argument('--label', help='метка запуска, например версия')
+    parser.add_argument('--output', help='записать результаты в JSON')
+    parser.add_argument('--compare', help='сравнить с результатами из JSON')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    args = parser.parse_args()
+
+    report = run(args.backends, args.corpora, args.label)
+    print_table(report)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(json.load(file), report, args.threshold)
+        for line in regressions:
+            print('REGRESSION', line)
+        sys.exit(1 if regressions else 0)
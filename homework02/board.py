@@ -0,0 +1,86 @@
+from typing import Iterator, List, Optional, Tuple, Union
+
+# Клетка задается индексом 0..80; блоки 0..26 - это 9 строк, 9 столбцов и 9 квадратов.
+CELL_UNITS = [(i // 9, 9 + i % 9, 18 + i // 27 * 3 + i % 9 // 3) for i in range(81)]
+UNITS = [[i for i in range(81) if u in CELL_UNITS[i]] for u in range(27)]
+PEERS = [
+    sorted({j for u in CELL_UNITS[i] for j in UNITS[u]} - {i})
+    for i in range(81)
+]
+
+_TO_CELLS = bytes.maketrans(b'.0123456789', bytes([0]) + bytes(range(10)))
+_FROM_CELLS = bytes.maketrans(bytes(range(10)), b'.123456789')
+_SOLVED_UNIT = bytes(range(1, 10))
+
+
+class Board:
+    """ Поле Судоку в виде 81 байта: 0 - пустая клетка, 1..9 - цифры.
+
+    >>> board = Board.from_grid([list('53..7....')] + [['.'] * 9 for _ in range(8)])
+    >>> board[0, 1], board[2]
+    (3, 0)
+    >>> str(board)[:9]
+    '53..7....'
+    >>> sorted(board.possible_values(2))
+    [1, 2, 4, 6, 8, 9]
+    """
+
+    __slots__ = ('cells',)
+
+    def __init__(self, cells: Optional[bytes] = None) -> None:
+        self.cells = bytearray(81) if cells is None else bytearray(cells)
+        if len(self.cells) != 81:
+            raise ValueError(f'Board needs 81 cells, got {len(self.cells)}')
+
+    @classmethod
+    def from_grid(cls, grid: List[List[str]]) -> 'Board':
+        """ Создать поле из списка списков строк """
+        return cls.from_string(''.join(''.join(row) for row in grid))
+
+    @classmethod
+    def from_string(cls, line: str) -> 'Board':
+        """ Создать поле из строки в 81 символ; пустая клетка - '.' или '0' """
+        return cls(line.encode('ascii').translate(_TO_CELLS))
+
+    def to_grid(self) -> List[List[str]]:
+        """ Перевести поле в список списков строк """
+        line = str(self)
+        return [list(line[i:i + 9]) for i in range(0, 81, 9)]
+
+    def copy(self) -> 'Board':
+        return Board(self.cells)
+
+    def _index(self, pos: Union[int, Tuple[int, int]]) -> int:
+        return pos if isinstance(pos, int) else pos[0] * 9 + pos[1]
+
+    def __getitem__(self, pos: Union[int, Tuple[int, int]]) -> int:
+        return self.cells[self._index(pos)]
+
+    def __setitem__(self, pos: Union[int, Tuple[int, int]], value: int) -> None:
+        self.cells[self._index(pos)] = value
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.cells)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Board) and self.cells == other.cells
+
+    def __str__(self) -> str:
+        return self.cells.translate(_FROM_CELLS).decode('ascii')
+
+    def __repr__(self) -> str:
+        return f'Board({str(self)!r})'
+
+    def possible_values(self, pos: Union[int, Tuple[int, int]]) -> set:
+        """ Множество цифр, которые не встречаются среди соседей клетки """
+        cells = self.cells
+        return set(range(1, 10)).difference(cells[j] for j in PEERS[self._index(pos)])
+
+    def is_solved(self) -> bool:
+        """ Каждая строка, столбец и квадрат содержат цифры от 1 до 9
+
+        >>> Board().is_solved()
+        False
+        """
+        cells = self.cells
+        return all(bytes(sorted(cells[i] for i in unit)) == _SOLVED_UNIT for unit in UNITS)
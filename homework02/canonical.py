@@ -0,0 +1,229 @@
+import random
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+from board import Board
+from sudoku import solve
+
+Grid = List[List[str]]
+
+# Ограничение на число равноценных вариантов при поиске. Его хватает
+# для обычных пазлов; для очень симметричных поиск обрезается, и ключ
+# остается корректным преобразованием пазла, но может не совпасть
+# с ключами эквивалентных пазлов.
+MAX_CANDIDATES = 20000
+# Пазлы с меньшим числом подсказок не имеют единственного решения и почти
+# не ограничивают поиск канонического вида (пустое поле - сотни мс), а
+# решаются за доли миллисекунды, поэтому кэш их решает напрямую.
+MIN_CLUES = 17
+
+
+class Transform(NamedTuple):
+    """ Преобразование пазла в канонический вид
+
+    transposed - транспонировать ли поле, rows[r] и cols[c] - какие строка
+    и столбец (после транспонирования) становятся строкой r и столбцом c,
+    digits[d] - во что переходит цифра d (digits[0] = 0).
+    """
+    transposed: bool
+    rows: Tuple[int, ...]
+    cols: Tuple[int, ...]
+    digits: Tuple[int, ...]
+
+
+def _cells(grid: Union[Grid, Board]) -> List[int]:
+    board = grid if isinstance(grid, Board) else Board.from_grid(grid)
+    return list(board.cells)
+
+
+def _allowed(chosen: Tuple[int, ...]) -> List[int]:
+    """ Какие строки (или столбцы) можно поставить следующими, не разрывая полосы
+
+    >>> _allowed(())
+    [0, 1, 2, 3, 4, 5, 6, 7, 8]
+    >>> _allowed((4,))
+    [3, 5]
+    >>> _allowed((4, 3, 5))
+    [0, 1, 2, 6, 7, 8]
+    """
+    if len(chosen) % 3:
+        band = chosen[-1] // 3
+        return [i for i in range(band * 3, band * 3 + 3) if i not in chosen]
+    bands = {i // 3 for i in chosen}
+    return [i for i in range(9) if i // 3 not in bands]
+
+
+def canonical_form(grid: Union[Grid, Board]) -> Tuple[str, Transform]:
+    """ Канонический вид пазла и преобразование, которое к нему приводит
+
+    Канонический вид - лексикографически наименьшая строка (0 - пустая
+    клетка) среди всех пазлов, получаемых перестановкой цифр, строк внутри
+    полос, столбцов внутри стопок, самих полос и стопок и транспонированием.
+
+    >>> puzzle = [list(row) for row in ['53..7....', '6..195...', '.98....6.', '8...6...3', '4..8.3..1',
+    ...                                 '7...2...6', '.6....28.', '...419..5', '....8..79']]
+    >>> key, transform = canonical_form(puzzle)
+    >>> key == canonical_form(shuffle(puzzle, random.Random(1)))[0]
+    True
+    >>> restore(apply(puzzle, transform), transform) == puzzle
+    True
+    """
+    cells = _cells(grid)
+    sources = (cells, [cells[c * 9 + r] for r in range(9) for c in range(9)])
+
+    # Состояние: (транспонирование, строки, столбцы, метки цифр, следующая метка)
+    states = [(t, (r,), (), (0,) * 10, 1) for t in (0, 1) for r in range(9)]
+
+    # Строка 0: столбцы выбираются по одному, остаются только варианты
+    # с наименьшей меткой в очередной клетке.
+    for _ in range(9):
+        best, expanded = 10, []
+        for t, rows, cols, labels, next_label in states:
+            row = sources[t][rows[0] * 9:rows[0] * 9 + 9]
+            for col in _allowed(cols):
+                digit = row[col]
+                label = labels[digit] if not digit or labels[digit] else next_label
+                if label < best:
+                    best, expanded = label, []
+                if label == best:
+                    expanded.append((t, rows, cols + (col,), labels, digit, next_label))
+        states = []
+        for t, rows, cols, labels, digit, next_label in expanded[:MAX_CANDIDATES]:
+            if digit and not labels[digit]:
+                labels = labels[:digit] + (next_label,) + labels[digit + 1:]
+                next_label += 1
+            states.append((t, rows, cols, labels, next_label))
+
+    # Остальные строки выбираются целиком.
+    for _ in range(8):
+        best_line, expanded = None, []
+        for t, rows, cols, labels, next_label in states:
+            source = sources[t]
+            for r in _allowed(rows):
+                new_labels, label = list(labels), next_label
+                line = []
+                for col in cols:
+                    digit = source[r * 9 + col]
+                    if digit and not new_labels[digit]:
+                        new_labels[digit] = label
+                        label += 1
+                    line.append(new_labels[digit])
+                if best_line is None or line < best_line:
+                    best_line, expanded = line, []
+                if line == best_line:
+                    expanded.append((t, rows + (r,), cols, tuple(new_labels), label))
+        states = expanded[:MAX_CANDIDATES]
+
+    t, rows, cols, labels, next_label = states[0]
+    # Цифрам, которых нет в пазле, достаются оставшиеся метки по порядку.
+    digits = list(labels)
+    for digit in range(1, 10):
+        if not digits[digit]:
+            digits[digit] = next_label
+            next_label += 1
+
+    transform = Transform(bool(t), rows, cols, tuple(digits))
+    return str(apply(grid, transform)), transform
+
+
+def apply(grid: Union[Grid, Board], transform: Transform) -> Board:
+    """ Применить преобразование к пазлу """
+    cells = _cells(grid)
+    result = Board()
+    for r, source_row in enumerate(transform.rows):
+        for c, source_col in enumerate(transform.cols):
+            cell = source_col * 9 + source_row if transform.transposed else source_row * 9 + source_col
+            result[r, c] = transform.digits[cells[cell]]
+    return result
+
+
+def restore(grid: Union[Grid, Board], transform: Transform) -> Grid:
+    """ Применить к пазлу преобразование, обратное transform """
+    cells = _cells(grid)
+    digits = [0] * 10
+    for digit, label in enumerate(transform.digits):
+        digits[label] = digit
+
+    result = Board()
+    for r, source_row in enumerate(transform.rows):
+        for c, source_col in enumerate(transform.cols):
+            cell = source_col * 9 + source_row if transform.transposed else source_row * 9 + source_col
+            result[cell] = digits[cells[r * 9 + c]]
+    return result.to_grid()
+
+
+def shuffle(grid: Grid, rng: Optional[random.Random] = None) -> Grid:
+    """ Случайный пазл, эквивалентный grid; без rng берутся функции модуля random """
+    sample = random.sample if rng is None else rng.sample
+    coin = random.random if rng is None else rng.random
+
+    def order() -> List[int]:
+        bands = sample(range(3), 3)
+        return [band * 3 + i for band in bands for i in sample(range(3), 3)]
+
+    labels = [0] + sample(range(1, 10), 9)
+    transform = Transform(coin() < 0.5, tuple(order()), tuple(order()), tuple(labels))
+    return apply(grid, transform).to_grid()
+
+
+class SolutionCache:
+    """ LRU-кэш решений по каноническому виду пазла
+
+    Пазлы, отличающиеся перестановкой цифр, строк, столбцов, полос, стопок
+    и транспонированием, решаются один раз; решение переводится обратно
+    в исходный вид.
+
+    >>> cache = SolutionCache(maxsize=10)
+    >>> puzzle = [list(row) for row in ['53..7....', '6..195...', '.98....6.', '8...6...3', '4..8.3..1',
+    ...                                 '7...2...6', '.6....28.', '...419..5', '....8..79']]
+    >>> other = shuffle(puzzle, random.Random(2))
+    >>> cache.solve([row[:] for row in puzzle]) == solve([row[:] for row in puzzle])
+    True
+    >>> cache.solve([row[:] for row in other]) == solve([row[:] for row in other])
+    True
+    >>> cache.hits, cache.misses, cache.hit_rate
+    (1, 1, 0.5)
+    >>> Board.from_grid(cache.solve([['.'] * 9 for _ in range(9)])).is_solved()
+    True
+    >>> cache.hits, cache.misses, len(cache)
+    (1, 1, 1)
+    """
+
+    def __init__(self, maxsize: int = 1024, backend: str = 'propagation') -> None:
+        self.maxsize = maxsize
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._solutions: 'OrderedDict[str, Optional[Board]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._solutions)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def solve(self, grid: Grid) -> Optional[Grid]:
+        """ Решить пазл, используя кэш; решение записывается в grid """
+        if sum(cell != '.' for row in grid for cell in row) < MIN_CLUES:
+            return solve(grid, self.backend)
+
+        key, transform = canonical_form(grid)
+
+        if key in self._solutions:
+            self.hits += 1
+            self._solutions.move_to_end(key)
+            solution = self._solutions[key]
+        else:
+            self.misses += 1
+            solution = solve(Board.from_string(key), self.backend)
+            self._solutions[key] = solution
+            if len(self._solutions) > self.maxsize:
+                self._solutions.popitem(last=False)
+
+        if solution is None:
+            return None
+        for r, row in enumerate(restore(solution, transform)):
+            grid[r][:] = row
+        return grid
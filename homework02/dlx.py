@@ -0,0 +1,230 @@
+from math import isqrt
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+SYMBOLS = '123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+class DancingLinks:
+    """ Алгоритм X Кнута на «танцующих ссылках» для задачи точного покрытия.
+
+    Узлы хранятся в параллельных списках: 0 - корень, 1..columns - заголовки
+    столбцов, остальные - единицы матрицы.
+
+    >>> dlx = DancingLinks(3, [[0, 1], [2], [1, 2], [0]])
+    >>> dlx.run()
+    2
+    """
+
+    def __init__(self, columns: int, rows: Sequence[Sequence[int]]) -> None:
+        self.left = [columns] + list(range(columns))
+        self.right = list(range(1, columns + 1)) + [0]
+        self.up = list(range(columns + 1))
+        self.down = list(range(columns + 1))
+        self.column = list(range(columns + 1))
+        self.row = [-1] * (columns + 1)
+        self.size = [0] * (columns + 1)
+
+        for row_id, row in enumerate(rows):
+            first = None
+            for col in row:
+                header = col + 1
+                node = len(self.column)
+                self.column.append(header)
+                self.row.append(row_id)
+                self.up.append(self.up[header])
+                self.down.append(header)
+                self.down[self.up[header]] = node
+                self.up[header] = node
+                self.size[header] += 1
+
+                if first is None:
+                    first = node
+                    self.left.append(node)
+                    self.right.append(node)
+                else:
+                    self.left.append(self.left[first])
+                    self.right.append(first)
+                    self.right[self.left[first]] = node
+                    self.left[first] = node
+
+    def cover(self, col: int) -> None:
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, col: int) -> None:
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def run(self, limit: Optional[int] = None,
+            on_solution: Optional[Callable[[List[int]], None]] = None,
+            stats: Any = None) -> int:
+        """ Найти решения (не более limit) и вернуть их количество.
+
+        Для каждого решения вызывается on_solution со списком номеров строк.
+        В stats (sudoku.SolveStats) записываются счетчики поиска.
+        """
+        found = 0
+        partial: List[int] = []
+
+        def search() -> bool:
+            nonlocal found
+            right, down, size = self.right, self.down, self.size
+            if stats is not None:
+                stats.enter(len(partial))
+
+            if right[0] == 0:
+                found += 1
+                if on_solution is not None:
+                    on_solution(list(partial))
+                return limit is not None and found >= limit
+
+            # Столбец с наименьшим числом единиц (эвристика S)
+            col, best = 0, None
+            j = right[0]
+            while j != 0:
+                if best is None or size[j] < best:
+                    col, best = j, size[j]
+                    if best < 2:
+                        break
+                j = right[j]
+            if not best:
+                return False
+
+            self.cover(col)
+            i = down[col]
+            while i != col:
+                if stats is not None:
+                    if best > 1:
+                        stats.guesses += 1
+                    else:
+                        stats.propagations += 1
+                partial.append(self.row[i])
+                j = right[i]
+                while j != i:
+                    self.cover(self.column[j])
+                    j = right[j]
+
+                stop = search()
+
+                j = self.left[i]
+                while j != i:
+                    self.uncover(self.column[j])
+                    j = self.left[j]
+                partial.pop()
+                if stop:
+                    self.uncover(col)
+                    return True
+                if stats is not None and best > 1:
+                    stats.backtracks += 1
+                i = down[i]
+            self.uncover(col)
+            return False
+
+        search()
+        return found
+
+
+def _exact_cover(grid: List[List[str]]) -> Optional[Tuple[DancingLinks, List[Tuple[int, int, int]]]]:
+    """ Построить матрицу точного покрытия для пазла размером n² х n².
+
+    Столбцы: клетка, цифра в строке, цифра в столбце, цифра в квадрате.
+    Возвращает None, если в пазле повторяются цифры.
+    """
+    size = len(grid)
+    box = isqrt(size)
+    if box * box != size or any(len(row) != size for row in grid):
+        raise ValueError(f'Grid must be n² x n², got {size} rows')
+
+    values = [[-1 if e == '.' else SYMBOLS.index(e) for e in row] for row in grid]
+    used = set()
+    for r in range(size):
+        for c in range(size):
+            d = values[r][c]
+            if d < 0:
+                continue
+            if d >= size:
+                raise ValueError(f'Unexpected symbol {grid[r][c]!r}')
+            b = r // box * box + c // box
+            keys = (('r', r, d), ('c', c, d), ('b', b, d))
+            if used.intersection(keys):
+                return None
+            used.update(keys)
+
+    area = size * size
+    choices = []
+    rows = []
+    for r in range(size):
+        for c in range(size):
+            b = r // box * box + c // box
+            digits = [values[r][c]] if values[r][c] >= 0 else range(size)
+            for d in digits:
+                if values[r][c] < 0 and (('r', r, d) in used or ('c', c, d) in used or ('b', b, d) in used):
+                    continue
+                choices.append((r, c, d))
+                rows.append([
+                    r * size + c,
+                    area + r * size + d,
+                    2 * area + c * size + d,
+                    3 * area + b * size + d,
+                ])
+
+    return DancingLinks(4 * area, rows), choices
+
+
+def solve_dlx(grid: List[List[str]], stats: Any = None) -> Optional[List[List[str]]]:
+    """ Решение пазла n² х n² через точное покрытие; решение записывается в grid
+
+    В stats (sudoku.SolveStats) записываются счетчики поиска.
+
+    >>> grid = [list(row) for row in ['1.3.', '..1.', '.1..', '4...']]
+    >>> solve_dlx(grid)
+    [['1', '2', '3', '4'], ['3', '4', '1', '2'], ['2', '1', '4', '3'], ['4', '3', '2', '1']]
+    """
+    problem = _exact_cover(grid)
+    if problem is None:
+        return None
+
+    dlx, choices = problem
+    solutions: List[List[int]] = []
+    if not dlx.run(limit=1, on_solution=solutions.append, stats=stats):
+        return None
+
+    for row_id in solutions[0]:
+        r, c, d = choices[row_id]
+        grid[r][c] = SYMBOLS[d]
+    return grid
+
+
+def count_solutions(grid: List[List[str]], limit: Optional[int] = None) -> int:
+    """ Количество решений пазла n² х n²; перебор останавливается на limit
+
+    >>> count_solutions([list('....') for _ in range(4)])
+    288
+    >>> count_solutions([list('....') for _ in range(4)], limit=2)
+    2
+    """
+    problem = _exact_cover(grid)
+    if problem is None:
+        return 0
+    dlx, _ = problem
+    return dlx.run(limit=limit)
@@ -0,0 +1,103 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+
+from board import Board
+from sudoku import count_solutions, difficulty, random_solution
+
+Grid = List[List[str]]
+
+LEVELS = ('easy', 'medium', 'hard')
+
+
+def remove_clues(solution: Board, min_clues: int = 17, rng: Optional[random.Random] = None) -> Board:
+    """ Убирать цифры из решения в случайном порядке, пока решение остается единственным
+
+    Останавливается, когда на поле остается min_clues цифр или больше
+    ни одну цифру убрать нельзя. Без rng берутся функции модуля random.
+    """
+    sample = random.sample if rng is None else rng.sample
+    board = solution.copy()
+    clues = 81
+    for cell in sample(range(81), 81):
+        if clues <= min_clues:
+            break
+        digit = board[cell]
+        board[cell] = 0
+        if count_solutions(board, limit=2) == 1:
+            clues -= 1
+        else:
+            board[cell] = digit
+    return board
+
+
+def generate_puzzle(
+        min_clues: int = 17,
+        level: Optional[str] = None,
+        seed: Optional[int] = None,
+        attempts: int = 100
+) -> Grid:
+    """ Сгенерировать пазл с единственным решением
+
+    Если задан level ('easy', 'medium' или 'hard'), пазлы генерируются,
+    пока сложность не совпадет, но не больше attempts раз.
+
+    >>> grid = generate_puzzle(min_clues=30, seed=1)
+    >>> count_solutions(grid), sum(e != '.' for row in grid for e in row) >= 30
+    (1, True)
+    >>> difficulty(generate_puzzle(level='easy', min_clues=40, seed=2))
+    'easy'
+    """
+    if level is not None and level not in LEVELS:
+        raise ValueError(f'Unknown level: {level}')
+
+    rng = random.Random(seed)
+    for _ in range(attempts):
+        puzzle = remove_clues(random_solution(rng), min_clues, rng)
+        if level is None or difficulty(puzzle) == level:
+            return puzzle.to_grid()
+
+    raise RuntimeError(f'No {level} puzzle in {attempts} attempts')
+
+
+def _generate_one(seed: int, min_clues: int, level: Optional[str]) -> str:
+    return str(Board.from_grid(generate_puzzle(min_clues, level, seed)))
+
+
+def generate_many(
+        count: int,
+        min_clues: int = 17,
+        level: Optional[str] = None,
+        workers: Optional[int] = None,
+        seed: Optional[int] = None
+) -> Iterator[Grid]:
+    """ Сгенерировать count пазлов в нескольких процессах
+
+    >>> len(list(generate_many(2, min_clues=40, workers=2, seed=3)))
+    2
+    """
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(64) for _ in range(count)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        lines = pool.map(_generate_one, seeds, [min_clues] * count, [level] * count, chunksize=16)
+        for line in lines:
+            yield Board.from_string(line).to_grid()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Сгенерировать пазлы, по одному на строку.')
+    parser.add_argument('count', type=int)
+    parser.add_argument('--min-clues', type=int, default=17)
+    parser.add_argument('--level', choices=LEVELS, default=None)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    for grid in generate_many(args.count, args.min_clues, args.level, args.workers):
+        print(''.join(''.join(row) for row in grid))
+    elapsed = time.perf_counter() - started
+    print(f'# {args.count} puzzles in {elapsed:.2f} s, {args.count / elapsed * 60:.0f} puzzles/min')
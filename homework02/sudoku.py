@@ -1,5 +1,8 @@
 import random
-from typing import List, Optional, Set, Tuple
+from typing import Callable, List, Optional, Set, Tuple, Union
+
+from board import CELL_UNITS, UNITS, Board
+from dlx import solve_dlx
 
 
 def read_sudoku(filename: str) -> List[List[str]]:
@@ -115,8 +118,49 @@ def find_possible_values(grid: List[List[str]], pos: Tuple[int, int]) -> Set[str
     return values - set(get_row(grid, pos)) - set(get_col(grid, pos)) - set(get_block(grid, pos))
 
 
-def solve(grid: List[List[str]]) -> Optional[List[List[str]]]:
-    """ Решение пазла, заданного в grid """
+class SolveStats:
+    """ Счетчики работы решателя
+
+    nodes - посещенные узлы поиска, guesses - попытки поставить цифру в
+    клетку с несколькими вариантами, backtracks - отмененные попытки,
+    propagations - цифры, поставленные распространением ограничений,
+    max_depth - наибольшая глубина поиска. Если задан on_node, он
+    вызывается в каждом узле с глубиной узла и самим объектом.
+    Без stats решатели ничего не считают.
+
+    >>> stats = SolveStats()
+    >>> solve(read_sudoku('puzzle2.txt'), stats=stats) is not None
+    True
+    >>> stats.nodes == stats.guesses + 1, stats.max_depth > 0, stats.propagations > 0
+    (True, True, True)
+    """
+
+    COUNTERS = ('nodes', 'guesses', 'backtracks', 'propagations', 'max_depth')
+
+    __slots__ = COUNTERS + ('on_node',)
+
+    def __init__(self, on_node: Optional[Callable[[int, 'SolveStats'], None]] = None) -> None:
+        self.nodes = 0
+        self.guesses = 0
+        self.backtracks = 0
+        self.propagations = 0
+        self.max_depth = 0
+        self.on_node = on_node
+
+    def enter(self, depth: int) -> None:
+        """ Отметить вход в узел поиска на глубине depth """
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.on_node is not None:
+            self.on_node(depth, self)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.COUNTERS}
+
+
+def solve_backtracking(grid: List[List[str]], stats: Optional[SolveStats] = None) -> Optional[List[List[str]]]:
+    """ Решение пазла, заданного в grid, простым перебором """
     """ Как решать Судоку?
         1. Найти свободную позицию
         2. Найти все возможные значения, которые могут находиться на этой позиции
@@ -125,9 +169,16 @@ def solve(grid: List[List[str]]) -> Optional[List[List[str]]]:
             3.2. Продолжить решать оставшуюся часть пазла
 
     >>> grid = read_sudoku('puzzle1.txt')
-    >>> solve(grid)
+    >>> solve_backtracking(grid)
     [['5', '3', '4', '6', '7', '8', '9', '1', '2'], ['6', '7', '2', '1', '9', '5', '3', '4', '8'], ['1', '9', '8', '3', '4', '2', '5', '6', '7'], ['8', '5', '9', '7', '6', '1', '4', '2', '3'], ['4', '2', '6', '8', '5', '3', '7', '9', '1'], ['7', '1', '3', '9', '2', '4', '8', '5', '6'], ['9', '6', '1', '5', '3', '7', '2', '8', '4'], ['2', '8', '7', '4', '1', '9', '6', '3', '5'], ['3', '4', '5', '2', '8', '6', '1', '7', '9']]
     """
+    return _backtrack(grid, stats, 0)
+
+
+def _backtrack(grid: List[List[str]], stats: Optional[SolveStats], depth: int) -> Optional[List[List[str]]]:
+    if stats is not None:
+        stats.enter(depth)
+
     pos = find_empty_positions(grid)
     if not pos:
         return grid
@@ -137,35 +188,369 @@ def solve(grid: List[List[str]]) -> Optional[List[List[str]]]:
 
     for value in values:
         grid[row][col] = value
+        if stats is not None and len(values) > 1:
+            stats.guesses += 1
 
-        solution = solve(grid)
+        solution = _backtrack(grid, stats, depth + 1)
         if solution is not None:
             return solution
 
+        if stats is not None and len(values) > 1:
+            stats.backtracks += 1
+
     grid[row][col] = "."
 
 
-def check_solution(solution: List[List[str]]) -> bool:
-    """ Если решение solution верно, то вернуть True, в противном случае False """
-    # TODO: Add doctests with bad puzzles
+# Маска всех цифр для решателя на битовых масках, бит d - цифра d + 1.
+ALL_DIGITS = 0x1FF
+BIT_DIGIT = {1 << d: d + 1 for d in range(9)}
 
-    for row in range(len(solution)):
-        if set(solution[row]) != set("123456789"):
-            return False
 
-    for col in range(len(solution)):
-        if set(get_col(solution, (0, col))) != set("123456789"):
-            return False
+def _place(values: List[int], used: List[int], trail: List[int], cell: int, bit: int) -> None:
+    """ Поставить цифру bit в клетку cell и обновить маски блоков """
+    values[cell] = BIT_DIGIT[bit]
+    r, c, b = CELL_UNITS[cell]
+    used[r] |= bit
+    used[c] |= bit
+    used[b] |= bit
+    trail.append(cell)
 
-    for row in range(len(solution), 3):
-        for col in range(len(solution), 3):
-            block = set(get_block(solution, (row, col)))
-            if block != set("123456789"):
+
+def _undo(values: List[int], used: List[int], trail: List[int], size: int = 0) -> None:
+    """ Отменить все постановки из trail после позиции size """
+    while len(trail) > size:
+        cell = trail.pop()
+        mask = ~(1 << (values[cell] - 1))
+        r, c, b = CELL_UNITS[cell]
+        used[r] &= mask
+        used[c] &= mask
+        used[b] &= mask
+        values[cell] = 0
+
+
+def _propagate(values: List[int], used: List[int], trail: List[int], hidden: bool = True) -> bool:
+    """ Расставить все одиночки (naked и, если hidden, hidden singles).
+
+    Возвращает False, если найдено противоречие.
+    """
+    changed = True
+    while changed:
+        changed = False
+
+        for cell in range(81):
+            if values[cell]:
+                continue
+            r, c, b = CELL_UNITS[cell]
+            candidates = ALL_DIGITS & ~(used[r] | used[c] | used[b])
+            if not candidates:
                 return False
+            if not candidates & (candidates - 1):
+                _place(values, used, trail, cell, candidates)
+                changed = True
+
+        if not hidden:
+            continue
+
+        for unit in range(27):
+            once = twice = 0
+            for cell in UNITS[unit]:
+                if not values[cell]:
+                    r, c, b = CELL_UNITS[cell]
+                    candidates = ALL_DIGITS & ~(used[r] | used[c] | used[b])
+                    twice |= once & candidates
+                    once |= candidates
+            if once | used[unit] != ALL_DIGITS:
+                return False
+
+            singles = once & ~twice
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                for cell in UNITS[unit]:
+                    if not values[cell]:
+                        r, c, b = CELL_UNITS[cell]
+                        if bit & ~(used[r] | used[c] | used[b]):
+                            _place(values, used, trail, cell, bit)
+                            changed = True
+                            break
 
     return True
 
 
+def _choose_branches(values: List[int], used: List[int]) -> Optional[List[Tuple[int, int]]]:
+    """ Варианты ветвления - пары (клетка, бит цифры); None, если пустых клеток нет.
+
+    Ветвиться можно по цифрам клетки с наименьшим числом вариантов или по
+    клеткам блока, куда еще можно поставить какую-то цифру. Выбирается
+    меньший из этих наборов: на пазлах, где у всех клеток много вариантов,
+    места для цифры в блоке часто всего два (так ветвится и DLX).
+    """
+    best, best_candidates, best_count = -1, 0, 10
+    candidates = [0] * 81
+    for cell in range(81):
+        if not values[cell]:
+            r, c, b = CELL_UNITS[cell]
+            candidates[cell] = cell_candidates = ALL_DIGITS & ~(used[r] | used[c] | used[b])
+            count = bin(cell_candidates).count('1')
+            if count < best_count:
+                best, best_candidates, best_count = cell, cell_candidates, count
+                if count == 2:
+                    break
+    if best < 0:
+        return None
+
+    branches = []
+    bits = best_candidates
+    while bits:
+        bit = bits & -bits
+        bits ^= bit
+        branches.append((best, bit))
+    if best_count == 2:
+        return branches
+
+    for unit in range(27):
+        missing = ALL_DIGITS & ~used[unit]
+        while missing:
+            bit = missing & -missing
+            missing ^= bit
+            places = [cell for cell in UNITS[unit] if candidates[cell] & bit]
+            if len(places) < len(branches):
+                branches = [(cell, bit) for cell in places]
+                if len(branches) == 2:
+                    return branches
+    return branches
+
+
+def _search(
+        values: List[int],
+        used: List[int],
+        trail: List[int],
+        stats: Optional[SolveStats] = None,
+        depth: int = 0
+) -> bool:
+    """ Поиск с распространением ограничений и ветвлением по наименьшему набору вариантов """
+    if stats is not None:
+        stats.enter(depth)
+
+    size = len(trail)
+    if not _propagate(values, used, trail):
+        _undo(values, used, trail, size)
+        return False
+    if stats is not None:
+        stats.propagations += len(trail) - size
+
+    branches = _choose_branches(values, used)
+    if branches is None:
+        return True
+
+    for cell, bit in branches:
+        _place(values, used, trail, cell, bit)
+        if stats is not None:
+            stats.guesses += 1
+        if _search(values, used, trail, stats, depth + 1):
+            return True
+        _undo(values, used, trail, len(trail) - 1)
+        if stats is not None:
+            stats.backtracks += 1
+
+    _undo(values, used, trail, size)
+    return False
+
+
+def _count(values: List[int], used: List[int], trail: List[int], limit: int) -> int:
+    """ Число решений, но не больше limit; values и used возвращаются в исходное состояние """
+    size = len(trail)
+    if not _propagate(values, used, trail):
+        _undo(values, used, trail, size)
+        return 0
+
+    branches = _choose_branches(values, used)
+    if branches is None:
+        _undo(values, used, trail, size)
+        return 1
+
+    found = 0
+    for cell, bit in branches:
+        if found >= limit:
+            break
+        _place(values, used, trail, cell, bit)
+        found += _count(values, used, trail, limit - found)
+        _undo(values, used, trail, len(trail) - 1)
+
+    _undo(values, used, trail, size)
+    return found
+
+
+def _load(board: Board) -> Optional[Tuple[List[int], List[int]]]:
+    """ Перевести пазл в список цифр и маски блоков; None, если цифры повторяются """
+    values = list(board.cells)
+    used = [0] * 27
+    for cell, value in enumerate(values):
+        if value:
+            bit = 1 << (value - 1)
+            for unit in CELL_UNITS[cell]:
+                if used[unit] & bit:
+                    return None
+                used[unit] |= bit
+    return values, used
+
+
+def solve_propagation(
+        grid: Union[List[List[str]], Board],
+        stats: Optional[SolveStats] = None
+) -> Optional[Union[List[List[str]], Board]]:
+    """ Решение пазла, заданного в grid, с распространением ограничений
+
+    Маски занятых цифр строк, столбцов и квадратов обновляются по мере
+    расстановки, одиночки расставляются сразу, а перебор идет по клетке
+    с наименьшим числом вариантов или по местам цифры в блоке, если их
+    меньше. Решение записывается в grid, который
+    может быть списком списков или Board.
+
+    >>> solve_propagation([['1', '1'] + ['.'] * 7] + [['.'] * 9 for _ in range(8)]) is None
+    True
+    >>> solve_propagation(Board.from_string(''.join(open('puzzle1.txt').read().split()))).is_solved()
+    True
+    """
+    is_board = isinstance(grid, Board)
+    state = _load(grid if is_board else Board.from_grid(grid))
+    if state is None:
+        return None
+
+    values, used = state
+    if not _search(values, used, [], stats):
+        return None
+
+    if is_board:
+        grid.cells[:] = bytes(values)
+    else:
+        for cell, value in enumerate(values):
+            grid[cell // 9][cell % 9] = str(value)
+    return grid
+
+
+def count_solutions(grid: Union[List[List[str]], Board], limit: int = 2) -> int:
+    """ Число решений пазла, но не больше limit
+
+    >>> count_solutions(read_sudoku('puzzle1.txt'))
+    1
+    >>> count_solutions([['.'] * 9 for _ in range(9)], limit=5)
+    5
+    """
+    state = _load(grid if isinstance(grid, Board) else Board.from_grid(grid))
+    if state is None:
+        return 0
+    values, used = state
+    return _count(values, used, [], limit)
+
+
+def difficulty(grid: Union[List[List[str]], Board]) -> Optional[str]:
+    """ Оценить сложность пазла по приемам, нужным для решения
+
+    'easy' - хватает naked singles, 'medium' - нужны hidden singles,
+    'hard' - без перебора не обойтись; None, если решения нет.
+
+    >>> difficulty(read_sudoku('puzzle1.txt'))
+    'easy'
+    >>> difficulty(read_sudoku('puzzle2.txt'))
+    'hard'
+    """
+    state = _load(grid if isinstance(grid, Board) else Board.from_grid(grid))
+    if state is None:
+        return None
+
+    values, used = state
+    for level, hidden in (('easy', False), ('medium', True)):
+        trail: List[int] = []
+        if not _propagate(values, used, trail, hidden):
+            return None
+        if all(values):
+            return level
+        _undo(values, used, trail)
+
+    return 'hard' if _search(values, used, []) else None
+
+
+def random_solution(rng: Optional[random.Random] = None) -> Board:
+    """ Случайное заполненное поле
+
+    Три квадрата на диагонали независимы, поэтому заполняются случайными
+    перестановками, а остальное достраивает решатель. Без rng берутся
+    функции модуля random.
+
+    >>> random_solution().is_solved()
+    True
+    """
+    sample = random.sample if rng is None else rng.sample
+    board = Board()
+    for box in (18, 22, 26):
+        for cell, digit in zip(UNITS[box], sample(range(1, 10), 9)):
+            board[cell] = digit
+    return solve_propagation(board)
+
+
+BACKENDS = {
+    'propagation': solve_propagation,
+    'backtracking': solve_backtracking,
+    'dlx': solve_dlx,
+}
+
+
+def solve(
+        grid: Union[List[List[str]], Board],
+        backend: str = 'propagation',
+        stats: Optional[SolveStats] = None
+) -> Optional[Union[List[List[str]], Board]]:
+    """ Решение пазла, заданного в grid
+
+    backend выбирает решатель: 'propagation' (по умолчанию), 'backtracking'
+    или 'dlx'; только 'dlx' решает пазлы размером больше 9 х 9. Пазл можно
+    передать и как Board, тогда решение записывается в него. В stats
+    (SolveStats) решатель записывает счетчики поиска.
+
+    >>> grid = read_sudoku('puzzle1.txt')
+    >>> solve(grid)
+    [['5', '3', '4', '6', '7', '8', '9', '1', '2'], ['6', '7', '2', '1', '9', '5', '3', '4', '8'], ['1', '9', '8', '3', '4', '2', '5', '6', '7'], ['8', '5', '9', '7', '6', '1', '4', '2', '3'], ['4', '2', '6', '8', '5', '3', '7', '9', '1'], ['7', '1', '3', '9', '2', '4', '8', '5', '6'], ['9', '6', '1', '5', '3', '7', '2', '8', '4'], ['2', '8', '7', '4', '1', '9', '6', '3', '5'], ['3', '4', '5', '2', '8', '6', '1', '7', '9']]
+    >>> solve(read_sudoku('puzzle1.txt'), backend='dlx') == grid
+    True
+    >>> solve(Board.from_grid(read_sudoku('puzzle1.txt')), backend='dlx').to_grid() == grid
+    True
+    >>> stats = SolveStats()
+    >>> solve(read_sudoku('puzzle1.txt'), stats=stats) == grid, stats.nodes
+    (True, 1)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown backend: {backend}')
+    if isinstance(grid, Board):
+        if backend == 'propagation':
+            return solve_propagation(grid, stats)
+        solution = BACKENDS[backend](grid.to_grid(), stats)
+        if solution is None:
+            return None
+        grid.cells[:] = Board.from_grid(solution).cells
+        return grid
+    if backend != 'dlx' and len(grid) != 9:
+        raise ValueError(f'Backend {backend} solves only 9 x 9 puzzles')
+    return BACKENDS[backend](grid, stats)
+
+
+def check_solution(solution: Union[List[List[str]], Board]) -> bool:
+    """ Если решение solution верно, то вернуть True, в противном случае False
+
+    >>> check_solution(solve(read_sudoku('puzzle1.txt')))
+    True
+    >>> check_solution(read_sudoku('puzzle1.txt'))
+    False
+    >>> check_solution([[str((r * 3 + r // 3 + c) % 9 + 1) for c in range(9)] for r in range(9)])
+    True
+    >>> check_solution([[str((r + c) % 9 + 1) for c in range(9)] for r in range(9)])
+    False
+    """
+    if not isinstance(solution, Board):
+        solution = Board.from_grid(solution)
+    return solution.is_solved()
+
+
 def generate_sudoku(N: int) -> List[List[str]]:
     """ Генерация судоку заполненного на N элементов
 
@@ -189,18 +574,13 @@ def generate_sudoku(N: int) -> List[List[str]]:
     True
     """
 
-    grid = solve([["."] * 9 for _ in range(9)])
+    board = random_solution()
     N = 0 if N > 81 else 81 - N
 
-    while N != 0:
-        row = random.randint(0, 8)
-        col = random.randint(0, 8)
+    for cell in random.sample(range(81), N):
+        board[cell] = 0
 
-        if grid[row][col] != '.':
-            grid[row][col] = '.'
-            N -= 1
-
-    return grid
+    return board.to_grid()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,114 @@
+import argparse
+import itertools
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+
+from sudoku import group, solve
+
+Grid = List[List[str]]
+
+
+def parse_line(line: str) -> Grid:
+    """ Прочитать пазл из строки в 81 символ; пустая клетка - '.' или '0'
+
+    >>> parse_line('53..7....' + '.' * 72)[0]
+    ['5', '3', '.', '.', '7', '.', '.', '.', '.']
+    """
+    line = line.strip().replace('0', '.')
+    if len(line) != 81 or any(c not in '123456789.' for c in line):
+        raise ValueError(f'Expected 81 digits or dots, got {line!r}')
+    return group(list(line), 9)
+
+
+def format_grid(grid: Optional[Grid]) -> str:
+    """ Записать пазл в одну строку; нерешенный пазл - пустая строка
+
+    >>> format_grid([['1', '2'], ['3', '4']])
+    '1234'
+    >>> format_grid(None)
+    ''
+    """
+    return '' if grid is None else ''.join(''.join(row) for row in grid)
+
+
+def read_puzzles(filename: str) -> Iterator[Grid]:
+    """ Лениво читать пазлы из файла, по одному на строку
+
+    Пустые строки и строки, начинающиеся с '#', пропускаются.
+    """
+    with open(filename) as file:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield parse_line(line)
+
+
+def write_solutions(filename: str, solutions: Iterable[Optional[Grid]]) -> int:
+    """ Записать решения в файл по мере поступления, вернуть их количество """
+    count = 0
+    with open(filename, 'w') as file:
+        for solution in solutions:
+            file.write(format_grid(solution) + '\n')
+            count += 1
+    return count
+
+
+def _solve_batch(lines: List[str], backend: str) -> List[str]:
+    return [format_grid(solve(parse_line(line), backend)) for line in lines]
+
+
+def solve_many(
+        puzzles: Iterable[Grid],
+        workers: Optional[int] = None,
+        batch_size: int = 256,
+        max_in_flight: Optional[int] = None,
+        backend: str = 'propagation'
+) -> Iterator[Optional[Grid]]:
+    """ Решить пазлы в нескольких процессах, сохраняя порядок
+
+    Пазлы читаются лениво пачками по batch_size, а в работе одновременно
+    находится не больше max_in_flight пачек (по умолчанию две на процесс).
+
+    >>> puzzles = [parse_line('.' * 81), parse_line('11' + '.' * 79)]
+    >>> [solution is not None for solution in solve_many(puzzles, workers=2, batch_size=1)]
+    [True, False]
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    lines = (format_grid(puzzle) for puzzle in puzzles)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending: deque = deque()
+
+    try:
+        while True:
+            while len(pending) < max_in_flight:
+                batch = list(itertools.islice(lines, batch_size))
+                if not batch:
+                    break
+                pending.append(pool.submit(_solve_batch, batch, backend))
+
+            if not pending:
+                return
+            for line in pending.popleft().result():
+                yield parse_line(line) if line else None
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Решить пазлы из файла, по одному на строку.')
+    parser.add_argument('puzzles')
+    parser.add_argument('solutions')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--backend', default='propagation')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    solutions = solve_many(read_puzzles(args.puzzles), args.workers, args.batch_size, backend=args.backend)
+    count = write_solutions(args.solutions, solutions)
+    elapsed = time.perf_counter() - started
+    print(f'{count} puzzles in {elapsed:.2f} s, {count / elapsed:.0f} puzzles/s')
@@ -0,0 +1,170 @@
+import abc
+import pathlib
+import random
+from typing import Any, Iterator, List, Optional, Tuple
+
+Cell = Tuple[int, int]
+Cells = List[int]
+Grid = List[Cells]
+
+MASK64 = 2 ** 64 - 1
+# Константы перемешивания splitmix64 для ключей Зобриста
+ZOBRIST_GAMMA = 0x9E3779B97F4A7C15
+ZOBRIST_MIX = (0xBF58476D1CE4E5B9, 0x94D049BB133111EB)
+
+
+def zobrist_key(index: int) -> int:
+    """
+    Ключ Зобриста клетки с номером index = row * cols + col.
+
+    Ключ - перемешанный (splitmix64) номер клетки, поэтому таблицу
+    ключей не нужно ни строить, ни хранить.
+
+    >>> zobrist_key(0) == zobrist_key(0) != zobrist_key(1)
+    True
+    """
+    z = (index + 1) * ZOBRIST_GAMMA & MASK64
+    z = (z ^ z >> 30) * ZOBRIST_MIX[0] & MASK64
+    z = (z ^ z >> 27) * ZOBRIST_MIX[1] & MASK64
+    return z ^ z >> 31
+
+
+class Engine(abc.ABC):
+    """
+    Движок, вычисляющий поколения клеток.
+
+    Движок хранит поле в своем формате (состоянии) и умеет переводить его
+    из списка списков и обратно. По умолчанию клетки за границей поля
+    считаются мертвыми, а соседи - восемь окружающих клеток; движки, которые
+    умеют другие топологии и окрестности (см. модуль topology), расширяют
+    TOPOLOGIES, NEIGHBOURHOODS и MAX_RADIUS (None - радиус не ограничен).
+    """
+
+    # Может ли next затереть состояния, кроме своего аргумента и результата
+    OVERWRITES_STATES = False
+    # Шире ли состояние поля rows x cols: тогда to_grid - лишь окно на него
+    WINDOWED = False
+    TOPOLOGIES = ('bounded',)
+    NEIGHBOURHOODS = ('moore',)
+    MAX_RADIUS: Optional[int] = 1
+
+    def __init__(self, size: Tuple[int, int]) -> None:
+        self.rows, self.cols = size
+        self.topology = 'bounded'
+        self.neighbourhood = 'moore'
+        self.radius = 1
+
+    def set_topology(self, topology: str, neighbourhood: str = 'moore', radius: int = 1) -> None:
+        """
+        Выбрать топологию поля и окрестность клетки.
+        """
+        if (topology not in self.TOPOLOGIES or neighbourhood not in self.NEIGHBOURHOODS
+                or self.MAX_RADIUS is not None and radius > self.MAX_RADIUS):
+            raise ValueError(
+                f'{type(self).__name__} does not support {topology} topology '
+                f'with {neighbourhood} neighbourhood of radius {radius}'
+            )
+        self.topology, self.neighbourhood, self.radius = topology, neighbourhood, radius
+
+    def create_state(self, randomize: bool = False) -> Any:
+        """
+        Состояние пустого или случайного поля.
+
+        Движки для больших полей переопределяют метод, чтобы не строить
+        список клеток.
+        """
+        return self.from_grid([
+            [random.choice([0, 1]) if randomize else 0 for _ in range(self.cols)]
+            for _ in range(self.rows)
+        ])
+
+    def read(self, filename: pathlib.Path) -> Any:
+        """
+        Прочитать состояние из файла в формате GameOfLife.save.
+        """
+        with filename.open() as file:
+            grid = [list(map(int, line.strip())) for line in file.readlines()]
+        return self.from_grid(grid)
+
+    def write(self, filename: pathlib.Path, state: Any) -> None:
+        """
+        Записать состояние в файл в формате GameOfLife.save.
+        """
+        grid_txt = '\n'.join(''.join(map(str, row)) for row in self.to_grid(state))
+        with filename.open(mode='w') as file:
+            file.write(grid_txt)
+
+    @abc.abstractmethod
+    def from_grid(self, grid: Grid) -> Any:
+        """
+        Перевести список клеток в состояние движка.
+        """
+
+    @abc.abstractmethod
+    def to_grid(self, state: Any) -> Grid:
+        """
+        Перевести состояние движка в список клеток.
+        """
+
+    def apply_grid(self, state: Any, old: Grid, new: Grid) -> Any:
+        """
+        Перенести в состояние правки окна: клетки, в которых список new
+        отличается от old.
+
+        Без WINDOWED окно - все поле, и состояние просто строится заново.
+        """
+        return self.from_grid(new)
+
+    @abc.abstractmethod
+    def next(self, state: Any) -> Any:
+        """
+        Получить состояние следующего поколения.
+        """
+
+    def advance(self, state: Any, generations: int) -> Any:
+        """
+        Получить состояние через generations поколений.
+        """
+        for _ in range(generations):
+            state = self.next(state)
+        return state
+
+    def live_cells(self, state: Any) -> Iterator[Cell]:
+        """
+        Координаты (row, col) живых клеток состояния.
+        """
+        for row, cells in enumerate(self.to_grid(state)):
+            for col, cell in enumerate(cells):
+                if cell:
+                    yield row, col
+
+    def state_hash(self, state: Any) -> int:
+        """
+        Хеш Зобриста поля: xor ключей живых клеток окна rows x cols.
+        """
+        board_hash = 0
+        for row, col in self.live_cells(state):
+            if 0 <= row < self.rows and 0 <= col < self.cols:
+                board_hash ^= zobrist_key(row * self.cols + col)
+        return board_hash
+
+    def hash_delta(self, first: Any, second: Any) -> int:
+        """
+        Изменение хеша Зобриста между двумя состояниями: xor ключей клеток,
+        различающихся в них.
+
+        Движки переопределяют метод, чтобы проходить только изменившиеся
+        клетки, а не все живые.
+        """
+        return self.state_hash(first) ^ self.state_hash(second)
+
+    def is_same(self, first: Any, second: Any) -> bool:
+        """
+        Совпадают ли два состояния.
+        """
+        return self.to_grid(first) == self.to_grid(second)
+
+    def close(self) -> None:
+        """
+        Освободить ресурсы движка.
+        """
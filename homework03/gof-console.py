@@ -1,16 +1,28 @@
 import argparse
 
-from life import GameOfLife
+from life import ENGINES, GameOfLife
 from life_console import Console
+from topology import ALL_TOPOLOGIES, NEIGHBOURHOODS
 
 parser = argparse.ArgumentParser(description='Game of life')
 parser.add_argument('--rows', default=24, type=int, nargs='?', help='Number of rows')
 parser.add_argument('--cols', default=80, type=int, nargs='?', help='Number of cols')
 parser.add_argument('--max-generations', default=50, type=int, nargs='?', help='Number of max generations')
+parser.add_argument('--engine', default=None, choices=sorted(ENGINES), help='Engine for computing generations')
+parser.add_argument('--topology', default='bounded', choices=ALL_TOPOLOGIES, help='How the edges of the field are glued')
+parser.add_argument('--neighbourhood', default='moore', choices=NEIGHBOURHOODS, help='Neighbourhood of a cell')
+parser.add_argument('--radius', default=1, type=int, help='Radius of the neighbourhood')
+parser.add_argument('--history', default=None, type=int,
+                    help='Generations remembered to stop on a cycle (default: 64 without an engine, 0 with one)')
 
 args = parser.parse_args()
 
-life = GameOfLife((args.rows, args.cols), max_generations=args.max_generations)
+try:
+    life = GameOfLife((args.rows, args.cols), max_generations=args.max_generations, engine=args.engine,
+                      history=args.history, topology=args.topology, neighbourhood=args.neighbourhood,
+                      radius=args.radius)
+except ValueError as error:
+    parser.error(str(error))
 
 ui = Console(life)
 ui.run()
@@ -1,12 +1,17 @@
 import argparse
 
-from life import GameOfLife
+from life import ENGINES, GameOfLife
 from life_gui import GUI
+from topology import ALL_TOPOLOGIES, NEIGHBOURHOODS
 
 parser = argparse.ArgumentParser(description='Game of life')
 parser.add_argument('--rows', default=24, type=int, nargs='?', help='Number of rows')
 parser.add_argument('--cols', default=80, type=int, nargs='?', help='Number of cols')
 parser.add_argument('--max-generations', default=50, type=int, nargs='?', help='Number of max generations')
+parser.add_argument('--engine', default=None, choices=sorted(ENGINES), help='Engine for computing generations')
+parser.add_argument('--topology', default='bounded', choices=ALL_TOPOLOGIES, help='How the edges of the field are glued')
+parser.add_argument('--neighbourhood', default='moore', choices=NEIGHBOURHOODS, help='Neighbourhood of a cell')
+parser.add_argument('--radius', default=1, type=int, help='Radius of the neighbourhood')
 parser.add_argument('--width', default=320, type=int, nargs='?', help='Screen width')
 parser.add_argument('--height', default=240, type=int, nargs='?', help='Screen height')
 parser.add_argument('--cell-size', default=20, type=int, nargs='?', help='Cell size')
@@ -14,7 +19,11 @@ parser.add_argument('--speed', default=10, type=int, nargs='?', help='Game speed
 
 args = parser.parse_args()
 
-life = GameOfLife((args.rows, args.cols), max_generations=args.max_generations)
+try:
+    life = GameOfLife((args.rows, args.cols), max_generations=args.max_generations, engine=args.engine,
+                      topology=args.topology, neighbourhood=args.neighbourhood, radius=args.radius)
+except ValueError as error:
+    parser.error(str(error))
 
 ui = GUI(life, args.width, args.height, args.cell_size, args.speed)
 ui.run()
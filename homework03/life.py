@@ -1,12 +1,41 @@
-import copy
+import collections
+import importlib
 import pathlib
 import random
-from typing import List, Optional, Tuple
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from engine import Engine, zobrist_key
+from topology import TOPOLOGIES, neighbour_table, validate
 
 Cell = Tuple[int, int]
 Cells = List[int]
 Grid = List[Cells]
 
+# Движки: имя -> (модуль, класс). Модули импортируются при создании
+# движка, поэтому, например, NumPy нужен только движку 'numpy'.
+ENGINES = {
+    'numpy': ('life_numpy', 'NumpyEngine'),
+    'bitpacked': ('life_bitpacked', 'BitPackedEngine'),
+    'sparse': ('life_sparse', 'SparseEngine'),
+    'hashlife': ('life_hashlife', 'HashLifeEngine'),
+    'parallel': ('life_parallel', 'ParallelEngine'),
+}
+
+# Сколько поколений по умолчанию помнить для поиска циклов без движка
+HISTORY = 64
+
+
+def create_engine(name: str, size: Tuple[int, int], **options: Any) -> Engine:
+    """
+    Создать движок по имени; options передаются конструктору движка
+    (например, max_nodes для 'hashlife' или workers для 'parallel').
+    """
+    if name not in ENGINES:
+        raise ValueError(f'Unknown engine: {name}')
+    module_name, class_name = ENGINES[name]
+    engine_class = getattr(importlib.import_module(module_name), class_name)
+    return engine_class(size, **options)
+
 
 class GameOfLife:
 
@@ -14,14 +43,68 @@ class GameOfLife:
             self,
             size: Tuple[int, int],
             randomize: bool = True,
-            max_generations: Optional[float] = float('inf')
+            max_generations: Optional[float] = float('inf'),
+            engine: Optional[str] = None,
+            history: Optional[int] = None,
+            topology: str = 'bounded',
+            neighbourhood: str = 'moore',
+            radius: int = 1,
+            engine_options: Optional[Dict[str, Any]] = None
     ) -> None:
         # Размер клеточного поля
         self.rows, self.cols = size
-        # Предыдущее поколение клеток
-        self.prev_generation = self.create_grid()
-        # Текущее поколение клеток
-        self.curr_generation = self.create_grid(randomize=randomize)
+        # Склейка краев поля и окрестность клетки (см. модуль topology)
+        self.topology = topology
+        self.neighbourhood = neighbourhood
+        self.radius = radius
+        # Таблица соседей для вычисления на списках, строится при первом шаге
+        self._neighbour_table: Optional[List[List[List[Cell]]]] = None
+        validate(topology, neighbourhood, radius)
+        if engine is None and topology not in TOPOLOGIES:
+            raise ValueError(f'Topology {topology} needs an engine that supports it')
+        if history and topology not in TOPOLOGIES:
+            # Окно на плоскости может повторяться, когда плоскость не повторяется
+            raise ValueError(f'Cycles cannot be detected on {topology} topology')
+        # Движок для вычисления поколений (None - списки Python)
+        self.engine = create_engine(engine, size, **(engine_options or {})) if engine else None
+        if self.engine is not None:
+            try:
+                self.engine.set_topology(topology, neighbourhood, radius)
+            except ValueError:
+                self.engine.close()
+                raise
+        self._prev_grid: Optional[Grid] = None
+        # Собственные списки игры, в которые пишутся новые поколения
+        self._buffers: List[Grid] = []
+        self._prev_state: Any = None
+        self._curr_grid: Optional[Grid] = None
+        self._curr_state: Any = None
+        # Копия выданного окна движка WINDOWED: правки списка переносятся в
+        # состояние разницей с ней
+        self._window: Optional[Grid] = None
+        # Число клеток, изменившихся на последнем шаге (None - неизвестно)
+        self._changed: Optional[int] = None
+        # Сколько последних поколений помнить для поиска циклов (0 - не искать).
+        # С движком поиск включается явно: даже обновление хеша только по
+        # изменившимся клеткам на плотном поле дороже самого шага движка.
+        if history is None:
+            history = HISTORY if self.engine is None else 0
+        self.history = history
+        self._hash: Optional[int] = None
+        self._hashes: Dict[int, int] = {}
+        self._hash_order: Deque[int] = collections.deque()
+        self._period: Optional[int] = None
+        self._cycle_start: Optional[int] = None
+        if self.engine is None:
+            # Предыдущее поколение клеток
+            self.prev_generation = self.create_grid()
+            # Текущее поколение клеток
+            self.curr_generation = self.create_grid(randomize=randomize)
+            self._buffers = [self._prev_grid, self._curr_grid]
+        else:
+            # С движком поля создаются сразу в его формате, без списков
+            self._prev_state = self.engine.create_state()
+            self._set_curr_state(self.engine.create_state(randomize))
         # Максимальное число поколений
         self.max_generations = max_generations
         # Текущее число поколений
@@ -35,45 +118,275 @@ class GameOfLife:
             ] for _ in range(self.rows)
         ]
 
+    def _neighbour_cells(self) -> List[List[List[Cell]]]:
+        """
+        Таблица соседей каждой клетки для выбранной топологии и окрестности.
+        """
+        if self._neighbour_table is None:
+            self._neighbour_table = neighbour_table(
+                (self.rows, self.cols), self.topology, self.neighbourhood, self.radius
+            )
+        return self._neighbour_table
+
     def get_neighbours(self, cell: Cell) -> Cells:
-        neighbours = []
+        grid = self.curr_generation
+        return [grid[h][w] for h, w in self._neighbour_cells()[cell[0]][cell[1]]]
 
-        for i in range(-1, 2):
-            for j in range(-1, 2):
-                h = cell[0] + i
-                w = cell[1] + j
+    @property
+    def curr_generation(self) -> Grid:
+        """
+        Текущее поколение клеток.
+
+        Если поколение посчитано движком, оно переводится в список при первом
+        обращении; после этого источником истины становится список, так как
+        его могут изменить снаружи (например, щелчком мыши в GUI).
 
-                if i == 0 and j == 0:
-                    continue
+        Исключение - движки, чье поле шире окна rows x cols (WINDOWED,
+        например HashLife на плоскости): список лишь окно на состояние, и
+        правки окна переносятся в состояние разницей, не стирая клетки
+        за окном.
+        """
+        if self._curr_grid is None:
+            self._curr_grid = self.engine.to_grid(self._curr_state)
+            if self.engine.WINDOWED:
+                self._window = [row[:] for row in self._curr_grid]
+            else:
+                self._curr_state = None
+        return self._curr_grid
 
-                if 0 <= w < self.cols and 0 <= h < self.rows:
-                    neighbours.append(self.curr_generation[h][w])
+    @curr_generation.setter
+    def curr_generation(self, grid: Grid) -> None:
+        if self.engine is not None and self.engine.WINDOWED and self._curr_state is not None:
+            state = self._curr_engine_state()
+            window = self._window if self._curr_grid is not None else self.engine.to_grid(state)
+            self._curr_state = self.engine.apply_grid(state, window, grid)
+            self._window = [row[:] for row in grid]
+        else:
+            self._curr_state = None
+        self._curr_grid = grid
+        self._changed = None
+        self._forget_history()
 
-        return neighbours
+    def _set_curr_state(self, state: Any) -> None:
+        self._curr_grid, self._curr_state = None, state
+        self._changed = None
+        self._forget_history()
 
-    def get_next_generation(self) -> Grid:
-        new_grid = copy.deepcopy(self.curr_generation)
+    @property
+    def prev_generation(self) -> Grid:
+        """
+        Предыдущее поколение клеток.
+        """
+        if self._prev_grid is None:
+            self._prev_grid = self.engine.to_grid(self._prev_state)
+        return self._prev_grid
+
+    @prev_generation.setter
+    def prev_generation(self, grid: Grid) -> None:
+        self._prev_grid, self._prev_state = grid, None
+        self._changed = None
+
+    def _curr_engine_state(self) -> Any:
+        if self._curr_state is None:
+            return self.engine.from_grid(self._curr_grid)
+        if self._curr_grid is not None and self._curr_grid != self._window:
+            # Выданное окно изменили на месте
+            self._curr_state = self.engine.apply_grid(self._curr_state, self._window, self._curr_grid)
+            self._window = [row[:] for row in self._curr_grid]
+        return self._curr_state
+
+    def _prev_engine_state(self) -> Any:
+        if self._prev_state is None:
+            self._prev_state = self.engine.from_grid(self._prev_grid)
+        return self._prev_state
+
+    def _back_buffer(self) -> Grid:
+        """
+        Собственный список игры, не занятый текущим поколением.
+        """
+        for grid in self._buffers:
+            if grid is not self._curr_grid:
+                return grid
+        grid = self.create_grid()
+        self._buffers.append(grid)
+        return grid
+
+    def _next_into(self, grid: Grid, hashing: bool = False) -> Tuple[int, int]:
+        """
+        Записать следующее поколение в grid.
+
+        Возвращает число изменившихся клеток и, если hashing, изменение
+        хеша поля (xor ключей Зобриста изменившихся клеток).
+        """
+        curr_generation = self.curr_generation
+        changed = 0
+        delta = 0
+
+        table = self._neighbour_cells()
 
         for h in range(self.rows):
+            row = curr_generation[h]
+            new_row = grid[h]
+            table_row = table[h]
             for w in range(self.cols):
-                neighbours = self.get_neighbours((h, w))
-                alive_neighbours = sum(neighbours)
+                alive_neighbours = 0
+                for i, j in table_row[w]:
+                    alive_neighbours += curr_generation[i][j]
+                cell = row[w]
 
                 if alive_neighbours != 2 and alive_neighbours != 3:
-                    new_grid[h][w] = 0
-
+                    new_cell = 0
                 elif alive_neighbours == 3:
-                    new_grid[h][w] = 1
+                    new_cell = 1
+                else:
+                    new_cell = cell
+
+                if new_cell != cell:
+                    changed += 1
+                    if hashing:
+                        delta ^= zobrist_key(h * self.cols + w)
+                new_row[w] = new_cell
 
+        return changed, delta
+
+    def get_next_generation(self) -> Grid:
+        if self.engine is not None:
+            if self.engine.OVERWRITES_STATES and self._prev_state is not None:
+                # next может записать результат поверх предыдущего поколения
+                self._prev_grid, self._prev_state = self.prev_generation, None
+            return self.engine.to_grid(self.engine.next(self._curr_engine_state()))
+
+        new_grid = self.create_grid()
+        self._next_into(new_grid)
         return new_grid
 
-    def step(self) -> None:
+    def step(self, generations: int = 1) -> None:
         """
-        Выполнить один шаг игры.
+        Выполнить generations шагов игры.
+
+        Предыдущим поколением становится поколение, непосредственно
+        предшествующее новому текущему. Движок может пропустить
+        промежуточные поколения (HashLife делает это за время порядка
+        log(generations)).
+
+        Без движка поколения хранятся в двух собственных списках игры,
+        которые меняются ролями на каждом шаге: новое поколение записывается
+        на место предыдущего. Поэтому список, полученный из prev_generation,
+        после следующего шага будет перезаписан. Списки, переданные в игру
+        снаружи, не изменяются.
+        """
+
+        if generations < 1:
+            return
+
+        start = self.generations
+        self.generations += generations
+        hashing = bool(self.history)
+
+        if self.engine is None:
+            if hashing and self._hash is None:
+                self._hash = self._grid_hash(self._curr_grid)
+                self._remember(self._hash, start)
+            for generation in range(start + 1, self.generations + 1):
+                back = self._back_buffer()
+                changed, delta = self._next_into(back, hashing)
+                self._prev_grid, self._curr_grid = self._curr_grid, back
+                if hashing:
+                    self._hash ^= delta
+                    self._remember(self._hash, generation)
+            self._changed = changed
+            return
+
+        first_state = state = self._curr_engine_state()
+        if hashing and self._hash is None:
+            self._hash = self.engine.state_hash(state)
+            self._remember(self._hash, start)
+        prev_grid = self._curr_grid
+        if generations > 1:
+            state = self.engine.advance(state, generations - 1)
+            prev_grid = None
+        self._prev_grid, self._prev_state = prev_grid, state
+        self._curr_grid, self._curr_state = None, self.engine.next(state)
+        self._changed = None
+        if hashing:
+            if generations == 1 or not self.engine.OVERWRITES_STATES:
+                # Движок проходит только клетки, изменившиеся за шаг
+                self._hash ^= self.engine.hash_delta(first_state, self._curr_state)
+            else:
+                # Начальное состояние могло быть затерто при advance
+                self._hash = self.engine.state_hash(self._curr_state)
+            self._remember(self._hash, self.generations)
+
+    def _grid_hash(self, grid: Grid) -> int:
+        """
+        Хеш Зобриста списка клеток: xor ключей живых клеток.
+        """
+        board_hash = 0
+        for row in range(self.rows):
+            for col in range(self.cols):
+                if grid[row][col]:
+                    board_hash ^= zobrist_key(row * self.cols + col)
+        return board_hash
+
+    def _remember(self, board_hash: int, generation: int) -> None:
+        """
+        Запомнить хеш поколения; повтор хеша означает цикл.
+        """
+        seen = self._hashes.get(board_hash)
+        if self._period is not None:
+            if seen is not None and (generation - seen) % self._period == 0:
+                return
+            # Поле вышло из найденного цикла - его изменили на месте. Правка
+            # сдвигает все следующие хеши на один и тот же xor, поэтому
+            # поиск продолжается с этого поколения.
+            self._hashes.clear()
+            self._hash_order.clear()
+            self._period = self._cycle_start = None
+            seen = None
+
+        if seen is not None:
+            self._cycle_start, self._period = seen, generation - seen
+            return
+
+        self._hashes[board_hash] = generation
+        self._hash_order.append(board_hash)
+        if len(self._hash_order) > self.history:
+            del self._hashes[self._hash_order.popleft()]
+
+    def _forget_history(self) -> None:
+        self._hash = None
+        self._hashes.clear()
+        self._hash_order.clear()
+        self._period = self._cycle_start = None
+
+    @property
+    def period(self) -> Optional[int]:
+        """
+        Период цикла, в который попала игра (1 - поле не меняется), или None.
+
+        Цикл ищется по хешам Зобриста последних history поколений, поэтому
+        находятся циклы с периодом не больше history; у игры с движком
+        history по умолчанию 0 и цикл не ищется, а на плоскости (topology
+        'plane') поиск невозможен. Если step пропускал поколения, найденный
+        период может быть кратен настоящему. Правка поля на месте замечается
+        на следующем шаге, если выводит поле из найденного цикла.
+        """
+        return self._period
+
+    @property
+    def cycle_start(self) -> Optional[int]:
         """
+        Номер поколения, с которого начался цикл, или None.
+        """
+        return self._cycle_start
 
-        self.generations += 1
-        self.prev_generation, self.curr_generation = self.curr_generation, self.get_next_generation()
+    def advance_to(self, generation: int) -> None:
+        """
+        Перейти к поколению с номером generation.
+        """
+        if generation < self.generations:
+            raise ValueError(f'Generation {generation} has already passed')
+        self.step(generation - self.generations)
 
     @property
     def is_max_generations_exceeded(self) -> bool:
@@ -86,11 +399,18 @@ class GameOfLife:
     def is_changing(self) -> bool:
         """
         Изменилось ли состояние клеток с предыдущего шага.
+
+        Без движка ответ берется из счетчика изменившихся клеток, который
+        ведет step, а сравнение поколений целиком нужно, только если
+        поколения заданы снаружи. Изменения списков на месте (например,
+        щелчком мыши в GUI) учитываются со следующего шага.
         """
 
-        # from pprint import pprint
-        # pprint(self.prev_generation)
-        # pprint(self.curr_generation)
+        if self._changed is not None:
+            return self._changed > 0
+
+        if self.engine is not None and self._curr_grid is None:
+            return not self.engine.is_same(self._prev_engine_state(), self._curr_state)
 
         for row in range(self.rows):
             for col in range(self.cols):
@@ -99,17 +419,29 @@ class GameOfLife:
         return False
 
     @staticmethod
-    def from_file(filename: pathlib.Path) -> 'GameOfLife':
+    def from_file(filename: pathlib.Path, engine: Optional[str] = None, **options: Any) -> 'GameOfLife':
         """
         Прочитать состояние клеток из указанного файла.
+
+        options передаются в GameOfLife (например, topology='plane' для
+        движка 'hashlife'). С движком файл читается самим движком
+        (engine.read), так что большие поля не проходят через списки.
         """
 
+        if engine is not None:
+            with filename.open() as file:
+                cols = len(file.readline().strip())
+                rows = 1 + sum(1 for _ in file)
+            new_game = GameOfLife((rows, cols), randomize=False, engine=engine, **options)
+            new_game._set_curr_state(new_game.engine.read(filename))
+            return new_game
+
         with filename.open() as file:
             grid = [list(map(int, col.strip())) for col in file.readlines()]
 
         size = len(grid), len(grid[0])
 
-        new_game = GameOfLife(size, randomize=False)
+        new_game = GameOfLife(size, randomize=False, engine=engine, **options)
         new_game.curr_generation = grid
         return new_game
 
@@ -118,6 +450,10 @@ class GameOfLife:
         Сохранить текущее состояние клеток в указанный файл.
         """
 
+        if self.engine is not None and self._curr_grid is None:
+            self.engine.write(filename, self._curr_state)
+            return
+
         grid_txt = '\n'.join([''.join(map(str, col)) for col in self.curr_generation])
 
         with filename.open(mode='w') as file:
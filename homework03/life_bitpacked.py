@@ -0,0 +1,181 @@
+import pathlib
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from engine import Cell, Engine, Grid
+from life_numpy import xor_keys
+
+# Клетки строки упакованы по 64 в слово: клетка col - бит col % 64
+# слова col // 64. Порядок байт задан явно, чтобы packbits/unpackbits
+# с bitorder='little' давали тот же порядок бит на любой платформе.
+WORD = np.dtype('<u8')
+WORD_BITS = 64
+# Сколько строк обрабатывать за раз: ограничивает размер временных массивов
+BLOCK_ROWS = 1024
+
+
+def _full_adder(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Побитно сложить три слова: вернуть (младший бит суммы, перенос).
+    """
+    t = a ^ b
+    return t ^ c, (a & b) | (t & c)
+
+
+class BitPackedEngine(Engine):
+    """
+    Движок на упакованных битах: поле - массив uint64 формы (rows, words),
+    следующее поколение считается побитовыми операциями над целыми словами,
+    то есть сразу для 64 клеток.
+
+    Восемь соседей складываются битовым сумматором в трехбитное число
+    (s2 s1 s0); клетка жива, если соседей два или три (s1 и не s2) и
+    либо их три (s0), либо клетка уже была жива. Восемь соседей дают
+    0 по модулю 8, то есть тоже смерть.
+    """
+
+    def __init__(self, size: Tuple[int, int]) -> None:
+        super().__init__(size)
+        self.words = -(-self.cols // WORD_BITS)
+        # Маска значащих бит последнего слова строки
+        tail = self.cols % WORD_BITS
+        self._tail_mask = np.array((1 << tail) - 1 if tail else 2 ** 64 - 1, dtype=WORD)
+
+    def pack(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Упаковать массив клеток (rows, cols) из нулей и единиц.
+        """
+        rows = cells.shape[0]
+        padded = np.zeros((rows, self.words * WORD_BITS), dtype=np.uint8)
+        padded[:, :self.cols] = cells
+        return np.packbits(padded, axis=1, bitorder='little').view(WORD)
+
+    def unpack(self, state: np.ndarray) -> np.ndarray:
+        """
+        Распаковать поле в массив клеток uint8 формы (rows, cols).
+        """
+        cells = np.unpackbits(state.view(np.uint8), axis=1, bitorder='little')
+        return cells[:, :self.cols]
+
+    def create_state(self, randomize: bool = False) -> np.ndarray:
+        if not randomize:
+            return np.zeros((self.rows, self.words), dtype=WORD)
+        state = np.random.randint(0, 2 ** 64, size=(self.rows, self.words), dtype=np.uint64).view(WORD)
+        state[:, -1] &= self._tail_mask
+        return state
+
+    def from_grid(self, grid: Grid) -> np.ndarray:
+        cells = np.array(grid, dtype=np.uint8).reshape(self.rows, self.cols)
+        return self.pack(cells)
+
+    def to_grid(self, state: np.ndarray) -> Grid:
+        return self.unpack(state).tolist()
+
+    def live_cells(self, state: np.ndarray) -> Iterator[Cell]:
+        rows, cols = np.nonzero(self.unpack(state))
+        return zip(rows.tolist(), cols.tolist())
+
+    def read(self, filename: pathlib.Path) -> np.ndarray:
+        """
+        Прочитать поле из файла построчно, не создавая списка клеток.
+        """
+        state = np.zeros((self.rows, self.words), dtype=WORD)
+        with filename.open('rb') as file:
+            for row, line in enumerate(file):
+                cells = np.frombuffer(line.strip(), dtype=np.uint8) - ord('0')
+                state[row] = self.pack(cells.reshape(1, -1))
+        return state
+
+    def write(self, filename: pathlib.Path, state: np.ndarray) -> None:
+        """
+        Записать поле в файл построчно.
+        """
+        with filename.open('wb') as file:
+            for row in range(self.rows):
+                if row:
+                    file.write(b'\n')
+                cells = self.unpack(state[row:row + 1])[0] + ord('0')
+                file.write(cells.tobytes())
+
+    def next(self, state: np.ndarray) -> np.ndarray:
+        rows, words = self.rows, self.words
+        new_state = np.empty_like(state)
+        # Блок строк с соседними строками сверху и снизу; за краем поля -
+        # мертвые строки. Копируется только блок, а не все поле.
+        block = np.zeros((BLOCK_ROWS + 2, words), dtype=WORD)
+        for start in range(0, rows, BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, rows)
+            top, bottom = max(start - 1, 0), min(stop + 1, rows)
+            padded = block[:stop - start + 2]
+            padded[0] = 0
+            padded[-1] = 0
+            padded[top - start + 1:bottom - start + 1] = state[top:bottom]
+            new_state[start:stop] = self._next_block(padded)
+        new_state[:, -1] &= self._tail_mask
+        return new_state
+
+    @staticmethod
+    def _shifted(block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Соседи слева и справа: слова, в которых бит клетки col равен
+        клетке col - 1 (col + 1) с переносом бита через границу слова.
+        """
+        one, top = np.uint64(1), np.uint64(WORD_BITS - 1)
+        west = block << one
+        west[:, 1:] |= block[:, :-1] >> top
+        east = block >> one
+        east[:, :-1] |= block[:, 1:] << top
+        return west, east
+
+    def _next_block(self, padded: np.ndarray) -> np.ndarray:
+        """
+        Следующее поколение для строк padded[1:-1].
+        """
+        north, alive, south = padded[:-2], padded[1:-1], padded[2:]
+        west, east = self._shifted(padded)
+        north_west, middle_west, south_west = west[:-2], west[1:-1], west[2:]
+        north_east, middle_east, south_east = east[:-2], east[1:-1], east[2:]
+
+        # Сумма восьми бит по разрядам: s0 (1), s1 (2), s2 (4)
+        a0, a1 = _full_adder(north_west, north, north_east)
+        b0, b1 = _full_adder(south_west, south, south_east)
+        c0 = middle_west ^ middle_east
+        c1 = middle_west & middle_east
+
+        s0, carry0 = _full_adder(a0, b0, c0)
+        t0, t1 = _full_adder(a1, b1, c1)
+        s1 = t0 ^ carry0
+        s2 = t1 ^ (t0 & carry0)
+
+        return s1 & ~s2 & (s0 | alive)
+
+    def _xor_bits(self, block: np.ndarray, first_row: int) -> int:
+        """
+        Xor ключей Зобриста клеток, чьи биты установлены в блоке строк,
+        начинающемся со строки first_row. Распаковываются только ненулевые
+        слова.
+        """
+        rows, words = np.nonzero(block)
+        if not len(rows):
+            return 0
+        bits = np.unpackbits(block[rows, words].view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+        hits, bit = np.nonzero(bits)
+        cells = (rows[hits] + first_row) * self.cols + words[hits] * WORD_BITS + bit
+        return xor_keys(cells)
+
+    def state_hash(self, state: np.ndarray) -> int:
+        board_hash = 0
+        for start in range(0, self.rows, BLOCK_ROWS):
+            board_hash ^= self._xor_bits(state[start:start + BLOCK_ROWS], start)
+        return board_hash
+
+    def hash_delta(self, first: np.ndarray, second: np.ndarray) -> int:
+        delta = 0
+        for start in range(0, self.rows, BLOCK_ROWS):
+            stop = start + BLOCK_ROWS
+            delta ^= self._xor_bits(first[start:stop] ^ second[start:stop], start)
+        return delta
+
+    def is_same(self, first: np.ndarray, second: np.ndarray) -> bool:
+        return np.array_equal(first, second)
@@ -36,7 +36,8 @@ class Console(UI):
 
         running = True
         while (
-                self.life.is_changing and not self.life.is_max_generations_exceeded
+                self.life.is_changing and self.life.period is None
+                and not self.life.is_max_generations_exceeded
         ) and running:
             try:
                 screen.clear()
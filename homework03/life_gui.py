@@ -71,6 +71,8 @@ class GUI(UI):
                         grid = self.life.curr_generation
                         w, h = event.pos[0] // self.cell_size, event.pos[1] // self.cell_size
                         grid[h][w] = 0 if grid[h - 1][w - 1] else 1
+                        # Поле изменено вручную: история поколений больше не верна
+                        self.life.curr_generation = grid
 
                     elif event.type == pygame.KEYUP and event.key == pygame.K_SPACE:
                         pause = not pause
@@ -0,0 +1,326 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from engine import Cell, Engine, Grid
+from topology import PLANE
+
+# Сколько узлов хранить до сборки мусора
+MAX_NODES = 1_000_000
+
+
+class Node:
+    """
+    Узел квадродерева: квадрат со стороной 2 ** level.
+
+    Листья (level == 0) - отдельные клетки. Узлы не изменяются и хранятся
+    в единственном экземпляре (hash consing), поэтому одинаковые участки
+    поля - это один и тот же объект, а сравнение узлов - сравнение ссылок.
+    """
+
+    __slots__ = ('level', 'nw', 'ne', 'sw', 'se', 'population')
+
+    def __init__(
+            self,
+            level: int,
+            nw: Optional['Node'],
+            ne: Optional['Node'],
+            sw: Optional['Node'],
+            se: Optional['Node'],
+            population: int
+    ) -> None:
+        self.level = level
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        # Число живых клеток в квадрате
+        self.population = population
+
+    def __repr__(self) -> str:
+        return f'Node(level={self.level}, population={self.population})'
+
+
+DEAD = Node(0, None, None, None, None, 0)
+ALIVE = Node(0, None, None, None, None, 1)
+
+
+class HashLifeEngine(Engine):
+    """
+    Движок HashLife (алгоритм Госпера) для расчета миллиардов поколений.
+
+    Поле хранится квадродеревом; для узла уровня k запоминается его центр
+    через 2 ** j поколений (j <= k - 2), и повторяющиеся участки поля и
+    времени считаются один раз. Поэтому advance на n поколений занимает
+    порядка log(n) шагов по дереву.
+
+    В отличие от остальных движков, поле не ограничено (топология 'plane'):
+    клетки живут и за пределами rows x cols, а from_grid/to_grid переводят
+    только это окно плоскости, начинающееся в точке (0, 0). Ограниченное
+    поле движок не поддерживает, поэтому GameOfLife с ним нужно создавать
+    с topology='plane'.
+
+    Узлы и результаты хранятся в таблицах, которые чистятся от недостижимых
+    из текущего поля узлов, когда узлов становится больше max_nodes
+    (None - не чистить никогда).
+    """
+
+    TOPOLOGIES = (PLANE,)
+    WINDOWED = True
+
+    def __init__(self, size: Tuple[int, int], max_nodes: Optional[int] = MAX_NODES) -> None:
+        super().__init__(size)
+        self.topology = PLANE
+        self.max_nodes = max_nodes
+        # Число сборок мусора
+        self.collections = 0
+        self._nodes: Dict[Tuple[Node, Node, Node, Node], Node] = {}
+        self._results: Dict[Tuple[Node, int], Node] = {}
+        self._empty: List[Node] = [DEAD]
+
+    def join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        """
+        Получить единственный узел из четырех четвертей.
+        """
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = self._nodes[key] = Node(nw.level + 1, nw, ne, sw, se, population)
+        return node
+
+    def empty(self, level: int) -> Node:
+        """
+        Пустой узел уровня level.
+        """
+        while len(self._empty) <= level:
+            node = self._empty[-1]
+            self._empty.append(self.join(node, node, node, node))
+        return self._empty[level]
+
+    def expand(self, node: Node) -> Node:
+        """
+        Окружить узел пустой рамкой: узел уровнем выше с тем же центром.
+        """
+        empty = self.empty(node.level - 1)
+        return self.join(
+            self.join(empty, empty, empty, node.nw),
+            self.join(empty, empty, node.ne, empty),
+            self.join(empty, node.sw, empty, empty),
+            self.join(node.se, empty, empty, empty)
+        )
+
+    def centre(self, node: Node) -> Node:
+        """
+        Центральный квадрат узла уровнем ниже.
+        """
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def _life_4x4(self, node: Node) -> Node:
+        """
+        Центр квадрата 4 x 4 через одно поколение.
+        """
+        cells = [
+            [node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+            [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+            [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+            [node.sw.sw, node.sw.se, node.se.sw, node.se.se],
+        ]
+        result = []
+        for row in (1, 2):
+            for col in (1, 2):
+                alive_neighbours = sum(
+                    cells[row + i][col + j].population
+                    for i in range(-1, 2)
+                    for j in range(-1, 2) if i or j
+                )
+                if alive_neighbours == 3 or alive_neighbours == 2 and cells[row][col].population:
+                    result.append(ALIVE)
+                else:
+                    result.append(DEAD)
+        return self.join(*result)
+
+    def successor(self, node: Node, j: int) -> Node:
+        """
+        Центр узла уровня k через 2 ** j поколений, j <= k - 2.
+        """
+        key = (node, j)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+
+        if node.population == 0:
+            result = node.nw
+        elif node.level == 2:
+            result = self._life_4x4(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            # Девять перекрывающихся квадратов уровня k - 1
+            squares = [
+                nw,
+                self.join(nw.ne, ne.nw, nw.se, ne.sw),
+                ne,
+                self.join(nw.sw, nw.se, sw.nw, sw.ne),
+                self.join(nw.se, ne.sw, sw.ne, se.nw),
+                self.join(ne.sw, ne.se, se.nw, se.ne),
+                sw,
+                self.join(sw.ne, se.nw, sw.se, se.sw),
+                se,
+            ]
+            # На полной скорости обе половины пути делаются через successor,
+            # иначе первая половина - просто взятие центра (0 поколений)
+            if j == node.level - 2:
+                j -= 1
+                c = [self.successor(square, j) for square in squares]
+            else:
+                c = [self.centre(square) for square in squares]
+            result = self.join(
+                self.successor(self.join(c[0], c[1], c[3], c[4]), j),
+                self.successor(self.join(c[1], c[2], c[4], c[5]), j),
+                self.successor(self.join(c[3], c[4], c[6], c[7]), j),
+                self.successor(self.join(c[4], c[5], c[7], c[8]), j),
+            )
+
+        self._results[key] = result
+        return result
+
+    def _jump(self, root: Node, j: int) -> Node:
+        """
+        Продвинуть все поле на 2 ** j поколений.
+        """
+        # За 2 ** j поколений узор растет не больше чем на 2 ** j клеток
+        # в каждую сторону. Если он занимает центр центра корня уровня
+        # не меньше j + 3, то весь результат окажется в центре корня.
+        while root.level < j + 3 or self.centre(self.centre(root)).population != root.population:
+            root = self.expand(root)
+        return self.successor(root, j)
+
+    def advance(self, state: Node, generations: int) -> Node:
+        root, j = state, 0
+        while generations:
+            if generations & 1:
+                root = self._jump(root, j)
+                if self.max_nodes is not None and len(self._nodes) > self.max_nodes:
+                    self.collect([root])
+            generations >>= 1
+            j += 1
+        return root
+
+    def next(self, state: Node) -> Node:
+        return self.advance(state, 1)
+
+    def collect(self, roots: Iterable[Node]) -> None:
+        """
+        Удалить из таблиц узлы, недостижимые из roots, и результаты для них.
+        """
+        marked = set()
+
+        def mark(stack: List[Node]) -> None:
+            while stack:
+                node = stack.pop()
+                if node.level and node not in marked:
+                    marked.add(node)
+                    stack.extend((node.nw, node.ne, node.sw, node.se))
+
+        mark(list(roots) + self._empty)
+        results = {key: result for key, result in self._results.items() if key[0] in marked}
+        mark(list(results.values()))
+
+        self._results = results
+        self._nodes = {(node.nw, node.ne, node.sw, node.se): node for node in marked}
+        self.collections += 1
+
+    def _build(self, grid: Grid, level: int, top: int, left: int) -> Node:
+        size = 1 << level
+        if top >= self.rows or left >= self.cols or top + size <= 0 or left + size <= 0:
+            return self.empty(level)
+        if level == 0:
+            return ALIVE if grid[top][left] else DEAD
+        half = size >> 1
+        return self.join(
+            self._build(grid, level - 1, top, left),
+            self._build(grid, level - 1, top, left + half),
+            self._build(grid, level - 1, top + half, left),
+            self._build(grid, level - 1, top + half, left + half),
+        )
+
+    def from_grid(self, grid: Grid) -> Node:
+        # Корень с центром в (0, 0), покрывающий окно rows x cols
+        level = max(3, (max(self.rows, self.cols) - 1).bit_length() + 1)
+        half = 1 << (level - 1)
+        return self._build(grid, level, -half, -half)
+
+    def _set_cell(self, node: Node, row: int, col: int, cell: int) -> Node:
+        """
+        Узел с клеткой (row, col), отсчитанной от его левого верхнего угла,
+        замененной на cell. Меняется только путь от узла до клетки.
+        """
+        if node.level == 0:
+            return ALIVE if cell else DEAD
+        half = 1 << (node.level - 1)
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        if row < half and col < half:
+            nw = self._set_cell(nw, row, col, cell)
+        elif row < half:
+            ne = self._set_cell(ne, row, col - half, cell)
+        elif col < half:
+            sw = self._set_cell(sw, row - half, col, cell)
+        else:
+            se = self._set_cell(se, row - half, col - half, cell)
+        return self.join(nw, ne, sw, se)
+
+    def apply_grid(self, state: Node, old: Grid, new: Grid) -> Node:
+        # Клетки за окном сохраняются: меняются только отличающиеся клетки
+        changes = [
+            (row, col, new[row][col])
+            for row in range(self.rows)
+            for col in range(self.cols) if new[row][col] != old[row][col]
+        ]
+        # Корень мог сжаться вокруг узора: расширяем, пока он не покроет окно
+        while 1 << (state.level - 1) < max(self.rows, self.cols):
+            state = self.expand(state)
+        half = 1 << (state.level - 1)
+        for row, col, cell in changes:
+            state = self._set_cell(state, row + half, col + half, cell)
+        return state
+
+    def live_cells(self, state: Node) -> Iterator[Cell]:
+        """
+        Координаты (row, col) всех живых клеток плоскости.
+        """
+        half = 1 << (state.level - 1)
+        stack = [(state, -half, -half)]
+        while stack:
+            node, top, left = stack.pop()
+            if not node.population:
+                continue
+            if node.level == 0:
+                yield top, left
+                continue
+            half = 1 << (node.level - 1)
+            stack.extend((
+                (node.nw, top, left),
+                (node.ne, top, left + half),
+                (node.sw, top + half, left),
+                (node.se, top + half, left + half),
+            ))
+
+    def to_grid(self, state: Node) -> Grid:
+        grid = [[0] * self.cols for _ in range(self.rows)]
+        half = 1 << (state.level - 1)
+        stack = [(state, -half, -half)]
+        while stack:
+            node, top, left = stack.pop()
+            size = 1 << node.level
+            if (not node.population or top >= self.rows or left >= self.cols
+                    or top + size <= 0 or left + size <= 0):
+                continue
+            if node.level == 0:
+                grid[top][left] = 1
+                continue
+            half = size >> 1
+            stack.extend((
+                (node.nw, top, left),
+                (node.ne, top, left + half),
+                (node.sw, top + half, left),
+                (node.se, top + half, left + half),
+            ))
+        return grid
+
+    def is_same(self, first: Node, second: Node) -> bool:
+        return first is second or self.to_grid(first) == self.to_grid(second)
@@ -0,0 +1,113 @@
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from engine import ZOBRIST_GAMMA, ZOBRIST_MIX, Cell, Engine, Grid
+from topology import NEIGHBOURHOODS, TOPOLOGIES, neighbour_offsets, wrap_cell
+
+
+def zobrist_keys(indices: np.ndarray) -> np.ndarray:
+    """
+    Ключи Зобриста (engine.zobrist_key) сразу для массива номеров клеток.
+    Умножение uint64 в NumPy идет по модулю 2 ** 64, как и нужно.
+    """
+    z = (indices.astype(np.uint64) + np.uint64(1)) * np.uint64(ZOBRIST_GAMMA)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(ZOBRIST_MIX[0])
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(ZOBRIST_MIX[1])
+    return z ^ (z >> np.uint64(31))
+
+
+def xor_keys(indices: np.ndarray) -> int:
+    """
+    Xor ключей Зобриста клеток с номерами indices.
+    """
+    if not len(indices):
+        return 0
+    return int(np.bitwise_xor.reduce(zobrist_keys(indices)))
+
+
+class NumpyEngine(Engine):
+    """
+    Движок на NumPy: поле - массив uint8, число соседей считается
+    суммой сдвинутых срезов поля, окруженного рамкой шириной в радиус
+    окрестности.
+
+    Для ограниченного поля рамка состоит из нулей. Для тора и бутылки Клейна
+    заранее строится таблица: какая клетка поля попадает в каждую клетку
+    рамки, и рамка заполняется одним обращением по индексам.
+    """
+
+    TOPOLOGIES = TOPOLOGIES
+    NEIGHBOURHOODS = NEIGHBOURHOODS
+    MAX_RADIUS = None
+
+    def __init__(self, size: Tuple[int, int]) -> None:
+        super().__init__(size)
+        self._prepare()
+
+    def set_topology(self, topology: str, neighbourhood: str = 'moore', radius: int = 1) -> None:
+        super().set_topology(topology, neighbourhood, radius)
+        self._prepare()
+
+    def _prepare(self) -> None:
+        radius = self.radius
+        self._offsets = neighbour_offsets(self.neighbourhood, radius)
+        # Поле с рамкой и буфер для числа соседей
+        self._padded = np.zeros((self.rows + 2 * radius, self.cols + 2 * radius), dtype=np.uint8)
+        dtype = np.uint8 if len(self._offsets) < 256 else np.uint16
+        self._counts = np.zeros((self.rows, self.cols), dtype=dtype)
+
+        # Клетки рамки (в координатах рамки) и клетки поля, которые в них видны
+        self._ghost_targets = None
+        if self.topology == 'bounded':
+            return
+        targets, sources = [], []
+        padded_rows, padded_cols = self._padded.shape
+        for row in range(padded_rows):
+            for col in range(padded_cols):
+                if radius <= row < padded_rows - radius and radius <= col < padded_cols - radius:
+                    continue
+                source = wrap_cell((row - radius, col - radius), (self.rows, self.cols), self.topology)
+                targets.append((row, col))
+                sources.append(source[0] * self.cols + source[1])
+        self._ghost_targets = tuple(np.array(targets, dtype=np.intp).T)
+        self._ghost_sources = np.array(sources, dtype=np.intp)
+
+    def create_state(self, randomize: bool = False) -> np.ndarray:
+        if randomize:
+            return np.random.randint(0, 2, size=(self.rows, self.cols), dtype=np.uint8)
+        return np.zeros((self.rows, self.cols), dtype=np.uint8)
+
+    def from_grid(self, grid: Grid) -> np.ndarray:
+        return np.array(grid, dtype=np.uint8).reshape(self.rows, self.cols)
+
+    def to_grid(self, state: np.ndarray) -> Grid:
+        return state.tolist()
+
+    def next(self, state: np.ndarray) -> np.ndarray:
+        padded, counts = self._padded, self._counts
+        rows, cols, radius = self.rows, self.cols, self.radius
+        padded[radius:radius + rows, radius:radius + cols] = state
+        if self._ghost_targets is not None:
+            padded[self._ghost_targets] = state.ravel()[self._ghost_sources]
+
+        counts.fill(0)
+        for i, j in self._offsets:
+            counts += padded[radius + i:radius + i + rows, radius + j:radius + j + cols]
+
+        alive = counts == 3
+        alive |= (counts == 2) & (state == 1)
+        return alive.view(np.uint8)
+
+    def live_cells(self, state: np.ndarray) -> Iterator[Cell]:
+        rows, cols = np.nonzero(state)
+        return zip(rows.tolist(), cols.tolist())
+
+    def state_hash(self, state: np.ndarray) -> int:
+        return xor_keys(np.flatnonzero(state))
+
+    def hash_delta(self, first: np.ndarray, second: np.ndarray) -> int:
+        return xor_keys(np.flatnonzero(first != second))
+
+    def is_same(self, first: np.ndarray, second: np.ndarray) -> bool:
+        return np.array_equal(first, second)
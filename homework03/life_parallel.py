@@ -0,0 +1,176 @@
+import argparse
+import os
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from engine import Cell, Engine, Grid
+from life_numpy import xor_keys
+
+# Буферы поля в процессе-обработчике: открываются один раз при запуске
+_worker_buffers: List[np.ndarray] = []
+_worker_memory: List[shared_memory.SharedMemory] = []
+
+
+def _init_worker(names: List[str], shape: Tuple[int, int]) -> None:
+    for name in names:
+        memory = shared_memory.SharedMemory(name=name)
+        _worker_memory.append(memory)
+        _worker_buffers.append(np.ndarray(shape, dtype=np.uint8, buffer=memory.buf))
+
+
+def _step_strip(task: Tuple[int, int, int]) -> None:
+    """
+    Посчитать строки [start, stop) поля из буфера src в другой буфер.
+
+    Буферы окружены рамкой из нулей, поэтому строки start - 1 и stop
+    (соседние полосы или рамка) читаются прямо из общей памяти.
+    """
+    src, start, stop = task
+    padded, out = _worker_buffers[src], _worker_buffers[1 - src]
+    rows, cols = stop - start, padded.shape[1] - 2
+    block = padded[start:stop + 2]
+
+    counts = np.zeros((rows, cols), dtype=np.uint8)
+    for i in range(3):
+        for j in range(3):
+            if i != 1 or j != 1:
+                counts += block[i:i + rows, j:j + cols]
+
+    alive = counts == 3
+    alive |= (counts == 2) & (block[1:-1, 1:-1] == 1)
+    out[start + 1:stop + 1, 1:-1] = alive
+
+
+def _release(pool: ProcessPoolExecutor, memory: List[shared_memory.SharedMemory]) -> None:
+    pool.shutdown()
+    for block in memory:
+        block.close()
+        block.unlink()
+
+
+class ParallelEngine(Engine):
+    """
+    Многопроцессный движок: поле делится на горизонтальные полосы, каждую
+    из которых считает свой процесс.
+
+    Поле лежит в двух буферах общей памяти (multiprocessing.shared_memory),
+    окруженных рамкой из нулей. Поколение читается из одного буфера и
+    пишется в другой, затем буферы меняются ролями, так что поле целиком
+    между процессами не копируется. Состояние движка - представление
+    одного из буферов, поэтому next затирает состояние, предшествующее
+    своему аргументу: действительны только два последних состояния.
+    """
+
+    OVERWRITES_STATES = True
+
+    def __init__(self, size: Tuple[int, int], workers: Optional[int] = None) -> None:
+        super().__init__(size)
+        self.workers = max(1, min(workers or os.cpu_count() or 1, self.rows))
+        shape = (self.rows + 2, self.cols + 2)
+
+        self._memory = [
+            shared_memory.SharedMemory(create=True, size=shape[0] * shape[1])
+            for _ in range(2)
+        ]
+        self._buffers = []
+        for memory in self._memory:
+            buffer = np.ndarray(shape, dtype=np.uint8, buffer=memory.buf)
+            buffer.fill(0)
+            self._buffers.append(buffer)
+        self._views = [buffer[1:-1, 1:-1] for buffer in self._buffers]
+
+        bounds = np.linspace(0, self.rows, self.workers + 1).astype(int)
+        self._strips = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=([memory.name for memory in self._memory], shape)
+        )
+        self._finalizer = weakref.finalize(self, _release, self._pool, self._memory)
+
+    def from_grid(self, grid: Grid) -> np.ndarray:
+        return np.array(grid, dtype=np.uint8).reshape(self.rows, self.cols)
+
+    def to_grid(self, state: np.ndarray) -> Grid:
+        return state.tolist()
+
+    def next(self, state: np.ndarray) -> np.ndarray:
+        if state is self._views[0]:
+            src = 0
+        elif state is self._views[1]:
+            src = 1
+        else:
+            # Состояние не из общей памяти (например, после from_grid)
+            src = 0
+            self._views[src][:] = state
+
+        tasks = [(src, start, stop) for start, stop in self._strips]
+        for _ in self._pool.map(_step_strip, tasks):
+            pass
+        return self._views[1 - src]
+
+    def live_cells(self, state: np.ndarray) -> Iterator[Cell]:
+        rows, cols = np.nonzero(state)
+        return zip(rows.tolist(), cols.tolist())
+
+    def state_hash(self, state: np.ndarray) -> int:
+        return xor_keys(np.flatnonzero(state))
+
+    def hash_delta(self, first: np.ndarray, second: np.ndarray) -> int:
+        return xor_keys(np.flatnonzero(first != second))
+
+    def is_same(self, first: np.ndarray, second: np.ndarray) -> bool:
+        return np.array_equal(first, second)
+
+    def close(self) -> None:
+        self._finalizer()
+
+
+def benchmark(
+        size: Tuple[int, int] = (2000, 2000),
+        generations: int = 20,
+        max_workers: Optional[int] = None
+) -> List[Tuple[int, float, float]]:
+    """
+    Замерить время generations поколений случайного поля для 1..max_workers
+    процессов.
+
+    Возвращает список кортежей (workers, seconds, speedup).
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    grid = np.random.randint(0, 2, size=size, dtype=np.uint8)
+    results = []
+
+    for workers in range(1, max_workers + 1):
+        engine = ParallelEngine(size, workers)
+        try:
+            # Первый шаг запускает процессы и не входит в замер
+            state = engine.next(grid)
+            started = time.perf_counter()
+            engine.advance(state, generations)
+            elapsed = time.perf_counter() - started
+        finally:
+            engine.close()
+        speedup = results[0][1] / elapsed if results else 1.0
+        results.append((workers, elapsed, speedup))
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parallel engine scaling benchmark')
+    parser.add_argument('--rows', default=2000, type=int, help='Number of rows')
+    parser.add_argument('--cols', default=2000, type=int, help='Number of cols')
+    parser.add_argument('--generations', default=20, type=int, help='Number of generations')
+    parser.add_argument('--max-workers', default=None, type=int, help='Maximum number of processes')
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+    for workers, elapsed, speedup in benchmark((args.rows, args.cols), args.generations, args.max_workers):
+        print(f'{workers:>8} {elapsed:>10.3f} {speedup:>8.2f}')
@@ -4,6 +4,7 @@ from typing import List, Tuple
 
 import pygame
 from pygame.locals import *
+from topology import neighbour_table
 
 Cell = Tuple[int, int]
 Cells = List[int]
@@ -12,7 +13,8 @@ Grid = List[Cells]
 
 class GameOfLife:
 
-    def __init__(self, width: int = 640, height: int = 480, cell_size: int = 10, speed: int = 10) -> None:
+    def __init__(self, width: int = 640, height: int = 480, cell_size: int = 10, speed: int = 10,
+                 topology: str = 'bounded', neighbourhood: str = 'moore', radius: int = 1) -> None:
         self.width = width
         self.height = height
         self.cell_size = cell_size
@@ -29,6 +31,9 @@ class GameOfLife:
         # Скорость протекания игры
         self.speed = speed
 
+        # Соседи каждой клетки для выбранной топологии и окрестности
+        self.neighbours = neighbour_table((self.cell_height, self.cell_width), topology, neighbourhood, radius)
+
     def draw_lines(self) -> None:
         """ Отрисовать сетку """
         for x in range(0, self.width, self.cell_size):
@@ -119,8 +124,9 @@ class GameOfLife:
     def get_neighbours(self, cell: Cell) -> Cells:
         """
         Вернуть список соседних клеток для клетки `cell`.
-        Соседними считаются клетки по горизонтали, вертикали и диагоналям,
-        то есть, во всех направлениях.
+        По умолчанию соседними считаются клетки по горизонтали, вертикали и
+        диагоналям, то есть, во всех направлениях; соседи берутся из заранее
+        построенной таблицы `neighbours` (см. модуль topology).
         Parameters
         ----------
         cell : Cell
@@ -131,20 +137,7 @@ class GameOfLife:
         out : Cells
             Список соседних клеток.
         """
-        neighbours = []
-
-        for i in range(-1, 2):
-            for j in range(-1, 2):
-                h = cell[0] + i
-                w = cell[1] + j
-
-                if i == 0 and j == 0:
-                    continue
-
-                if 0 <= w < self.cell_width and 0 <= h < self.cell_height:
-                    neighbours.append(self.grid[h][w])
-
-        return neighbours
+        return [self.grid[h][w] for h, w in self.neighbours[cell[0]][cell[1]]]
 
     def get_next_generation(self) -> Grid:
         """
@@ -0,0 +1,81 @@
+from typing import Iterator, NamedTuple, Set, Tuple
+
+from engine import Cell, Engine, Grid, zobrist_key
+
+NEIGHBOUR_OFFSETS = [(i, j) for i in range(-1, 2) for j in range(-1, 2) if i or j]
+
+
+class SparseState(NamedTuple):
+    # Живые клетки
+    live: Set[Cell]
+    # Клетки, изменившиеся при получении этого поколения
+    changed: Set[Cell]
+
+
+class SparseEngine(Engine):
+    """
+    Движок для почти пустых полей: хранит только живые клетки.
+
+    Клетка может измениться, только если изменилась она сама или кто-то из
+    ее соседей, поэтому на каждом шаге проверяются лишь клетки рядом с
+    изменившимися в прошлом поколении. Стоимость шага зависит от активности
+    на поле, а не от его площади.
+    """
+
+    def from_grid(self, grid: Grid) -> SparseState:
+        live = {
+            (row, col)
+            for row, cells in enumerate(grid)
+            for col, cell in enumerate(cells) if cell
+        }
+        # Для нового поля все живые клетки считаются изменившимися
+        return SparseState(live, set(live))
+
+    def to_grid(self, state: SparseState) -> Grid:
+        grid = [[0] * self.cols for _ in range(self.rows)]
+        for row, col in state.live:
+            grid[row][col] = 1
+        return grid
+
+    def next(self, state: SparseState) -> SparseState:
+        rows, cols = self.rows, self.cols
+        live = state.live
+
+        candidates = set()
+        for row, col in state.changed:
+            for i in range(row - 1, row + 2):
+                for j in range(col - 1, col + 2):
+                    if 0 <= i < rows and 0 <= j < cols:
+                        candidates.add((i, j))
+
+        born, died = set(), set()
+        for cell in candidates:
+            row, col = cell
+            alive_neighbours = 0
+            for i, j in NEIGHBOUR_OFFSETS:
+                if (row + i, col + j) in live:
+                    alive_neighbours += 1
+
+            if cell in live:
+                if alive_neighbours != 2 and alive_neighbours != 3:
+                    died.add(cell)
+            elif alive_neighbours == 3:
+                born.add(cell)
+
+        new_live = (live - died) | born if born or died else live
+        return SparseState(new_live, born | died)
+
+    def live_cells(self, state: SparseState) -> Iterator[Cell]:
+        return iter(state.live)
+
+    def hash_delta(self, first: SparseState, second: SparseState) -> int:
+        # Симметрическая разность множеств считается без цикла Python, а для
+        # соседних поколений она совпадает с изменившимися клетками
+        cols = self.cols
+        delta = 0
+        for row, col in first.live ^ second.live:
+            delta ^= zobrist_key(row * cols + col)
+        return delta
+
+    def is_same(self, first: SparseState, second: SparseState) -> bool:
+        return first.live == second.live
@@ -0,0 +1,369 @@
+import importlib.util
+import json
+import pathlib
+import random
+import tempfile
+import unittest
+
+from life import GameOfLife
+from life_hashlife import HashLifeEngine
+
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
+
+class EngineTests:
+    """
+    Тесты, общие для всех движков: результат должен совпадать
+    с вычислением на списках Python.
+    """
+
+    engine = None
+
+    def setUp(self):
+        self.grid = [
+            [1, 1, 0, 0, 1, 1, 1, 1],
+            [0, 1, 1, 1, 1, 1, 1, 0],
+            [1, 0, 1, 1, 0, 0, 0, 0],
+            [1, 0, 0, 0, 0, 0, 0, 1],
+            [1, 0, 1, 1, 1, 1, 0, 0],
+            [1, 1, 1, 1, 0, 1, 1, 1]
+        ]
+        self.rows = 6
+        self.cols = 8
+        self.max_generations = 18
+
+    def create_game(self, size=None, history=None):
+        game = GameOfLife(size or (self.rows, self.cols), engine=self.engine, history=history)
+        self.addCleanup(game.engine.close)
+        return game
+
+    def test_can_update(self):
+        game = self.create_game()
+        game.curr_generation = self.grid
+
+        with open('steps.txt') as f:
+            steps = json.load(f)
+
+        num_updates = 0
+        for step in sorted(steps.keys(), key=int):
+            with self.subTest(step=step):
+                for _ in range(int(step) - num_updates):
+                    game.curr_generation = game.get_next_generation()
+                    num_updates += 1
+                self.assertEqual(steps[step], game.curr_generation)
+
+    def test_step_matches_python(self):
+        random.seed(12345)
+        size = (37, 70)
+        reference = GameOfLife(size)
+        game = self.create_game(size)
+        game.curr_generation = [row[:] for row in reference.curr_generation]
+
+        for _ in range(10):
+            reference.step()
+            game.step()
+        self.assertEqual(reference.curr_generation, game.curr_generation)
+        self.assertEqual(reference.prev_generation, game.prev_generation)
+
+    def test_prev_generation_is_correct(self):
+        game = self.create_game()
+        game.curr_generation = self.grid
+        game.step()
+        self.assertEqual(game.prev_generation, self.grid)
+
+    def test_is_changing(self):
+        game = self.create_game()
+        game.curr_generation = self.grid
+        game.step()
+        self.assertTrue(game.is_changing)
+
+    def test_is_not_changing(self):
+        game = self.create_game()
+        game.curr_generation = self.grid
+        for _ in range(self.max_generations + 1):
+            game.step()
+        self.assertFalse(game.is_changing)
+
+    def test_period(self):
+        game = self.create_game((6, 6), history=64)
+        game.curr_generation = [[0] * 6 for _ in range(6)]
+        for col in range(1, 4):
+            game.curr_generation[2][col] = 1
+        for _ in range(3):
+            game.step()
+        self.assertEqual(game.period, 2)
+        self.assertEqual(game.cycle_start, 1)
+
+    def test_period_is_not_searched_by_default(self):
+        game = self.create_game((6, 6))
+        game.curr_generation = [[0] * 6 for _ in range(6)]
+        for _ in range(3):
+            game.step()
+        self.assertIsNone(game.period)
+
+    def test_hash_matches_python(self):
+        random.seed(12345)
+        size = (37, 70)
+        reference = GameOfLife(size)
+        game = self.create_game(size, history=64)
+        game.curr_generation = [row[:] for row in reference.curr_generation]
+
+        for generations in (1, 1, 3, 1, 5):
+            reference.step(generations)
+            game.step(generations)
+            self.assertEqual(reference._hash, game._hash)
+
+    def test_grid_changes_are_picked_up(self):
+        game = self.create_game((5, 5))
+        game.curr_generation = [[0] * 5 for _ in range(5)]
+        game.step()
+        for col in range(1, 4):
+            game.curr_generation[2][col] = 1
+        game.step()
+        self.assertEqual([row[2] for row in game.curr_generation], [0, 1, 1, 1, 0])
+
+
+@unittest.skipUnless(HAS_NUMPY, 'numpy is not installed')
+class TestNumpyEngine(EngineTests, unittest.TestCase):
+    engine = 'numpy'
+
+    def test_topologies_match_python(self):
+        random.seed(12345)
+        size = (13, 17)
+        for topology in ('bounded', 'torus', 'klein'):
+            for neighbourhood, radius in (('moore', 1), ('von_neumann', 1), ('moore', 2), ('von_neumann', 3)):
+                with self.subTest(topology=topology, neighbourhood=neighbourhood, radius=radius):
+                    options = {'topology': topology, 'neighbourhood': neighbourhood, 'radius': radius}
+                    reference = GameOfLife(size, **options)
+                    game = GameOfLife(size, engine='numpy', **options)
+                    game.curr_generation = [row[:] for row in reference.curr_generation]
+                    reference.step(5)
+                    game.step(5)
+                    self.assertEqual(reference.curr_generation, game.curr_generation)
+
+
+@unittest.skipUnless(HAS_NUMPY, 'numpy is not installed')
+class TestBitPackedEngine(EngineTests, unittest.TestCase):
+    engine = 'bitpacked'
+
+    def test_read_and_write_file(self):
+        game = self.create_game()
+        game.curr_generation = self.grid
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / 'grid.txt'
+            game.save(path)
+            state = game.engine.read(path)
+            self.assertEqual(game.engine.to_grid(state), self.grid)
+
+            game.engine.write(path, state)
+            self.assertEqual(GameOfLife.from_file(path).curr_generation, self.grid)
+
+    def test_large_board_skips_lists(self):
+        game = self.create_game((3000, 3000))
+        self.assertIsNone(game._curr_grid)
+        self.assertIsNone(game._prev_grid)
+        self.assertEqual(game._curr_state.shape, (3000, 47))
+        game.step()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / 'grid.txt'
+            game.save(path)
+            self.assertIsNone(game._curr_grid)
+            loaded = GameOfLife.from_file(path, engine=self.engine)
+            self.addCleanup(loaded.engine.close)
+            self.assertIsNone(loaded._curr_grid)
+            self.assertTrue(loaded.engine.is_same(loaded._curr_state, game._curr_state))
+            self.assertEqual((loaded.rows, loaded.cols), (3000, 3000))
+
+    def test_hash_spans_row_blocks(self):
+        random.seed(12345)
+        size = (2100, 70)
+        reference = GameOfLife(size)
+        game = self.create_game(size, history=64)
+        game.curr_generation = [row[:] for row in reference.curr_generation]
+        for generations in (1, 2):
+            reference.step(generations)
+            game.step(generations)
+            self.assertEqual(reference._hash, game._hash)
+
+
+@unittest.skipUnless(HAS_NUMPY, 'numpy is not installed')
+class TestParallelEngine(EngineTests, unittest.TestCase):
+    engine = 'parallel'
+
+    def test_next_generation_keeps_prev_generation(self):
+        random.seed(12345)
+        reference = GameOfLife((20, 20))
+        game = self.create_game((20, 20))
+        game.curr_generation = [row[:] for row in reference.curr_generation]
+        for _ in range(3):
+            reference.step()
+            game.step()
+
+        self.assertEqual(game.get_next_generation(), reference.get_next_generation())
+        self.assertEqual(game.prev_generation, reference.prev_generation)
+        self.assertEqual(game.is_changing, reference.is_changing)
+        game.step()
+        reference.step()
+        self.assertEqual(game.curr_generation, reference.curr_generation)
+        self.assertEqual(game.prev_generation, reference.prev_generation)
+
+    def test_strips_match_single_process(self):
+        from life_parallel import ParallelEngine
+
+        random.seed(12345)
+        grid = GameOfLife((50, 30)).curr_generation
+        results = []
+        for workers in (1, 3):
+            engine = ParallelEngine((50, 30), workers)
+            self.addCleanup(engine.close)
+            results.append(engine.to_grid(engine.advance(engine.from_grid(grid), 7)))
+        self.assertEqual(results[0], results[1])
+
+
+class TestSparseEngine(EngineTests, unittest.TestCase):
+    engine = 'sparse'
+
+    def test_unsupported_topology(self):
+        with self.assertRaises(ValueError):
+            GameOfLife((self.rows, self.cols), engine=self.engine, topology='torus')
+
+    def test_only_active_cells_are_stored(self):
+        game = self.create_game((1000, 1000))
+        game.curr_generation = [[0] * 1000 for _ in range(1000)]
+        for col in range(3):
+            game.curr_generation[500][499 + col] = 1
+        game.step()
+        game.step()
+        self.assertEqual(game._curr_state.live, {(500, 499), (500, 500), (500, 501)})
+        self.assertEqual(len(game._curr_state.changed), 4)
+
+
+class TestHashLifeEngine(unittest.TestCase):
+    """
+    HashLife считает неограниченную плоскость, поэтому с остальными
+    движками он сравнивается на узорах, не доходящих до края поля.
+    """
+
+    glider = [
+        [0, 1, 0],
+        [0, 0, 1],
+        [1, 1, 1],
+    ]
+
+    def setUp(self):
+        random.seed(12345)
+        self.grid = [
+            [random.choice([0, 1]) if 15 <= row < 25 and 15 <= col < 25 else 0 for col in range(40)]
+            for row in range(40)
+        ]
+
+    def create_game(self, engine=None, history=None):
+        topology = 'plane' if engine == 'hashlife' else 'bounded'
+        game = GameOfLife((40, 40), randomize=False, engine=engine, topology=topology, history=history)
+        game.curr_generation = [row[:] for row in self.grid]
+        return game
+
+    def test_step_matches_python(self):
+        reference = self.create_game()
+        game = self.create_game('hashlife')
+        for _ in range(10):
+            reference.step()
+            game.step()
+            self.assertEqual(reference.curr_generation, game.curr_generation)
+        self.assertEqual(reference.prev_generation, game.prev_generation)
+
+    def test_step_many_generations(self):
+        reference = self.create_game()
+        game = self.create_game('hashlife')
+        for _ in range(13):
+            reference.step()
+        game.step(13)
+        self.assertEqual(reference.curr_generation, game.curr_generation)
+        self.assertEqual(reference.prev_generation, game.prev_generation)
+        self.assertEqual(game.generations, 14)
+
+    def test_cycles_are_not_searched_on_plane(self):
+        with self.assertRaises(ValueError):
+            self.create_game('hashlife', history=64)
+        game = self.create_window()
+        game.step(30)
+        self.assertIsNone(game.period)
+
+    def test_advance_to(self):
+        game = self.create_game('hashlife')
+        game.advance_to(10)
+        self.assertEqual(game.generations, 10)
+        with self.assertRaises(ValueError):
+            game.advance_to(5)
+
+    def test_bounded_topology_is_rejected(self):
+        with self.assertRaises(ValueError):
+            GameOfLife((40, 40), engine='hashlife')
+        with self.assertRaises(ValueError):
+            GameOfLife((40, 40), topology='plane')
+
+    def create_window(self):
+        game = GameOfLife((6, 6), randomize=False, engine='hashlife', topology='plane')
+        game.curr_generation = [row + [0] * 3 for row in self.glider] + [[0] * 6 for _ in range(3)]
+        return game
+
+    def test_reading_window_keeps_plane(self):
+        games = [self.create_window(), self.create_window()]
+        for _ in range(30):
+            games[1].curr_generation
+            for game in games:
+                game.step()
+        self.assertEqual(games[0].curr_generation, games[1].curr_generation)
+        self.assertEqual(sum(map(sum, games[1].curr_generation)), 0)
+        self.assertEqual(len(list(games[1].engine.live_cells(games[1]._curr_state))), 5)
+
+    def test_window_edits_keep_plane(self):
+        game = self.create_window()
+        game.step(30)
+        grid = game.curr_generation
+        for col in range(1, 4):
+            grid[2][col] = 1
+        game.step()
+        self.assertEqual([row[2] for row in game.curr_generation], [0, 1, 1, 1, 0, 0])
+        game.curr_generation = [row[:] for row in game.curr_generation]
+        game.step()
+        self.assertEqual(game.curr_generation[2], [0, 1, 1, 1, 0, 0])
+        self.assertEqual(len(list(game.engine.live_cells(game._curr_state))), 8)
+
+    def test_from_file(self):
+        game = self.create_game('hashlife')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / 'grid.txt'
+            game.save(path)
+            loaded = GameOfLife.from_file(path, engine='hashlife', topology='plane')
+        self.assertEqual(loaded.curr_generation, self.grid)
+
+    def test_engine_options(self):
+        game = GameOfLife((40, 40), engine='hashlife', topology='plane', engine_options={'max_nodes': 500})
+        self.assertEqual(game.engine.max_nodes, 500)
+        game.step(1000)
+        self.assertGreater(game.engine.collections, 0)
+
+    def test_glider_after_billions_of_generations(self):
+        engine = HashLifeEngine((3, 3))
+        state = engine.advance(engine.from_grid(self.glider), 4 * 10 ** 9)
+        shift = 10 ** 9
+        expected = {
+            (row + shift, col + shift)
+            for row in range(3) for col in range(3) if self.glider[row][col]
+        }
+        self.assertEqual(set(engine.live_cells(state)), expected)
+
+    def test_garbage_collection(self):
+        reference = HashLifeEngine((40, 40), max_nodes=None)
+        engine = HashLifeEngine((40, 40), max_nodes=500)
+        expected = reference.advance(reference.from_grid(self.grid), 1000)
+        state = engine.advance(engine.from_grid(self.grid), 1000)
+        self.assertGreater(engine.collections, 0)
+        self.assertEqual(reference.collections, 0)
+        self.assertEqual(set(engine.live_cells(state)), set(reference.live_cells(expected)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -116,6 +116,46 @@ class TestGameOfLife(unittest.TestCase):
         game.step()
         self.assertEqual(game.prev_generation, self.grid)
 
+    def test_get_neighbours_on_torus(self):
+        game = GameOfLife((self.rows, self.cols), topology='torus')
+        game.curr_generation = self.grid
+        neighbours = game.get_neighbours((0, 2))
+        self.assertEqual(8, len(neighbours))
+        self.assertEqual(7, sum(neighbours))
+
+    def test_get_neighbours_on_klein_bottle(self):
+        game = GameOfLife((self.rows, self.cols), topology='klein')
+        game.curr_generation = self.grid
+        neighbours = game.get_neighbours((0, 2))
+        self.assertEqual(8, len(neighbours))
+        self.assertEqual(6, sum(neighbours))
+
+    def test_get_neighbours_for_von_neumann_neighbourhood(self):
+        game = GameOfLife((self.rows, self.cols), neighbourhood='von_neumann')
+        game.curr_generation = self.grid
+        self.assertEqual(4, len(game.get_neighbours((2, 3))))
+        self.assertEqual(2, len(game.get_neighbours((0, 0))))
+
+    def test_get_neighbours_for_larger_radius(self):
+        game = GameOfLife((self.rows, self.cols), radius=2)
+        game.curr_generation = self.grid
+        self.assertEqual(24, len(game.get_neighbours((2, 3))))
+        self.assertEqual(8, len(game.get_neighbours((0, 0))))
+
+    def test_glider_wraps_around_torus(self):
+        game = GameOfLife((6, 6), randomize=False, topology='torus')
+        for row, col in [(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)]:
+            game.curr_generation[row][col] = 1
+        start = [row[:] for row in game.curr_generation]
+        game.step(24)
+        self.assertEqual(start, game.curr_generation)
+
+    def test_unknown_topology(self):
+        with self.assertRaises(ValueError):
+            GameOfLife((self.rows, self.cols), topology='sphere')
+        with self.assertRaises(ValueError):
+            GameOfLife((self.rows, self.cols), neighbourhood='hex')
+
     def test_is_max_generations_exceed(self):
         max_generations = 4
         game = GameOfLife((self.rows, self.cols), max_generations=max_generations)
@@ -138,6 +178,90 @@ class TestGameOfLife(unittest.TestCase):
             game.step()
         self.assertFalse(game.is_changing)
 
+    def test_period_of_still_life(self):
+        game = GameOfLife((self.rows, self.cols))
+        game.curr_generation = self.grid
+        for _ in range(self.max_generations + 1):
+            game.step()
+        self.assertEqual(game.period, 1)
+        self.assertEqual(game.cycle_start, self.max_generations + 1)
+
+    def test_period_of_blinker(self):
+        game = GameOfLife((5, 5), randomize=False)
+        for col in range(1, 4):
+            game.curr_generation[2][col] = 1
+        self.assertIsNone(game.period)
+        game.step()
+        self.assertIsNone(game.period)
+        game.step()
+        self.assertEqual(game.period, 2)
+        self.assertEqual(game.cycle_start, 1)
+        self.assertTrue(game.is_changing)
+
+    def test_period_longer_than_history_is_not_found(self):
+        game = GameOfLife((5, 5), randomize=False, history=1)
+        for col in range(1, 4):
+            game.curr_generation[2][col] = 1
+        for _ in range(5):
+            game.step()
+        self.assertIsNone(game.period)
+
+    def test_in_place_edit_leaves_cycle(self):
+        game = GameOfLife((5, 5), randomize=False)
+        game.step()
+        self.assertEqual(game.period, 1)
+        for col in range(1, 4):
+            game.curr_generation[2][col] = 1
+        for _ in range(3):
+            game.step()
+        self.assertTrue(game.is_changing)
+        self.assertEqual(game.period, 2)
+        self.assertEqual(game.cycle_start, 3)
+
+    def test_setting_generation_resets_period(self):
+        game = GameOfLife((5, 5), randomize=False)
+        game.step()
+        self.assertEqual(game.period, 1)
+        game.curr_generation = game.create_grid()
+        self.assertIsNone(game.period)
+
+    def test_step_reuses_buffers(self):
+        game = GameOfLife((self.rows, self.cols))
+        game.curr_generation = self.grid
+        game.step()
+        first = game.curr_generation
+        game.step()
+        second = game.curr_generation
+        self.assertIsNot(first, second)
+        for _ in range(2):
+            game.step()
+            self.assertIs(game.curr_generation, first)
+            self.assertIs(game.prev_generation, second)
+            game.step()
+            self.assertIs(game.curr_generation, second)
+            self.assertIs(game.prev_generation, first)
+
+    def test_step_does_not_change_given_grid(self):
+        grid = [row[:] for row in self.grid]
+        game = GameOfLife((self.rows, self.cols))
+        game.curr_generation = grid
+        for _ in range(5):
+            game.step()
+        self.assertEqual(grid, self.grid)
+
+    def test_step_many_generations(self):
+        reference = GameOfLife((self.rows, self.cols))
+        reference.curr_generation = [row[:] for row in self.grid]
+        for _ in range(5):
+            reference.step()
+
+        game = GameOfLife((self.rows, self.cols))
+        game.curr_generation = self.grid
+        game.step(5)
+        self.assertEqual(reference.curr_generation, game.curr_generation)
+        self.assertEqual(reference.prev_generation, game.prev_generation)
+        self.assertEqual(game.generations, 6)
+
     def test_load_from_file(self):
         path = Path('grid.txt')
 
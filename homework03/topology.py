@@ -0,0 +1,111 @@
+from typing import List, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+# Топологии поля:
+#   bounded - за краем поля мертвые клетки;
+#   torus   - противоположные края склеены;
+#   klein   - левый и правый края склеены как у тора, а при переходе через
+#             верхний или нижний край поле отражается слева направо.
+TOPOLOGIES = ('bounded', 'torus', 'klein')
+# Неограниченная плоскость: поле rows x cols - лишь окно на ней. Соседей
+# у такой плоскости таблицей не задать, ее считает только движок hashlife.
+PLANE = 'plane'
+ALL_TOPOLOGIES = TOPOLOGIES + (PLANE,)
+# Окрестности: moore - квадрат, von_neumann - ромб заданного радиуса
+NEIGHBOURHOODS = ('moore', 'von_neumann')
+
+
+def validate(topology: str, neighbourhood: str, radius: int) -> None:
+    """
+    Проверить топологию и окрестность, выбросив ValueError для неизвестных.
+    """
+    if topology not in ALL_TOPOLOGIES:
+        raise ValueError(f'Unknown topology: {topology}')
+    if neighbourhood not in NEIGHBOURHOODS:
+        raise ValueError(f'Unknown neighbourhood: {neighbourhood}')
+    if radius < 1:
+        raise ValueError(f'Radius must be positive: {radius}')
+
+
+def neighbour_offsets(neighbourhood: str = 'moore', radius: int = 1) -> List[Cell]:
+    """
+    Смещения соседей клетки.
+
+    >>> len(neighbour_offsets('moore')), len(neighbour_offsets('von_neumann'))
+    (8, 4)
+    >>> len(neighbour_offsets('moore', 2))
+    24
+    """
+    validate('bounded', neighbourhood, radius)
+
+    return [
+        (i, j)
+        for i in range(-radius, radius + 1)
+        for j in range(-radius, radius + 1)
+        if (i or j) and (neighbourhood == 'moore' or abs(i) + abs(j) <= radius)
+    ]
+
+
+def wrap_cell(cell: Cell, size: Tuple[int, int], topology: str = 'bounded') -> Optional[Cell]:
+    """
+    Клетка поля, соответствующая координатам cell, возможно лежащим
+    за краем поля, или None, если там мертвая граница.
+
+    >>> wrap_cell((-1, 0), (4, 5), 'bounded') is None
+    True
+    >>> wrap_cell((-1, 0), (4, 5), 'torus')
+    (3, 0)
+    >>> wrap_cell((-1, 0), (4, 5), 'klein')
+    (3, 4)
+    """
+    row, col = cell
+    rows, cols = size
+
+    if topology == 'bounded':
+        return cell if 0 <= row < rows and 0 <= col < cols else None
+    if topology == 'torus':
+        return row % rows, col % cols
+    if topology == 'klein':
+        turns, row = divmod(row, rows)
+        col %= cols
+        if turns % 2:
+            col = cols - 1 - col
+        return row, col
+    raise ValueError(f'Unknown topology: {topology}')
+
+
+def neighbour_table(
+        size: Tuple[int, int],
+        topology: str = 'bounded',
+        neighbourhood: str = 'moore',
+        radius: int = 1
+) -> List[List[List[Cell]]]:
+    """
+    Таблица соседей: table[row][col] - список клеток-соседей клетки.
+
+    Таблица строится один раз, поэтому при подсчете соседей не нужны
+    проверки границ. На маленьком торе одна клетка может оказаться
+    соседом несколько раз и тогда учитывается несколько раз.
+    """
+    validate(topology, neighbourhood, radius)
+    if topology not in TOPOLOGIES:
+        raise ValueError(f'Topology {topology} has no finite neighbour table')
+
+    rows, cols = size
+    offsets = neighbour_offsets(neighbourhood, radius)
+    # Один кортеж на клетку, чтобы таблица ссылалась на общие объекты
+    cells = [[(row, col) for col in range(cols)] for row in range(rows)]
+
+    table = []
+    for row in range(rows):
+        table_row = []
+        for col in range(cols):
+            neighbours = []
+            for i, j in offsets:
+                neighbour = wrap_cell((row + i, col + j), size, topology)
+                if neighbour is not None:
+                    neighbours.append(cells[neighbour[0]][neighbour[1]])
+            table_row.append(neighbours)
+        table.append(table_row)
+    return table